@@ -0,0 +1,184 @@
+"""aggregate_cube.py
+Pre-aggregated governorate / district / town cube for drill-down views.
+
+refArea names either a district (Matn_District, Zahlé_District, ...) or, for
+towns whose district was not recorded, a governorate (Mount_Lebanon_Governorate).
+load_and_prepare collapses both to one "Governorate" label; the cube keeps the
+hierarchy instead:
+
+    governorate  ->  district  ->  town
+
+Districts are placed in governorates with DISTRICT_GOVERNORATE. Towns recorded
+only at governorate level go to that governorate's single district when it has
+exactly one (Akkar), and otherwise to a per-governorate "(district not recorded)"
+bucket, so totals always roll up exactly.
+
+All three levels are computed in one pass over the town table (town rows are
+summed to districts, districts rolled up to governorates) and stored as compact
+frames (categorical keys, int32 counts) sorted by parent then total, with a
+parent -> row-range index. query(level, parent) is an index lookup plus an
+iloc slice, typically well under a millisecond.
+
+Usage:
+    cube = load_cube()                              # or AggregateCube.from_town_table(town)
+    cube.query('governorate')                       # all governorates
+    cube.query('district', 'Mount Lebanon')         # districts of one governorate
+    cube.query('town', 'Matn')                      # towns of one district
+"""
+import numpy as np
+import pandas as pd
+
+import tourism_cache
+from town_snapshot import shared_town_table
+from visualization_clean import DEFAULT_CSV, FACILITY_TOTALS, build_tables
+
+
+LEVELS = ('governorate', 'district', 'town')
+
+# District (as cleaned by visualization_clean) -> governorate, per the 2017 division
+# that separated Keserwan-Jbeil from Mount Lebanon
+DISTRICT_GOVERNORATE = {
+    'Akkar': 'Akkar',
+    'Baalbek': 'Baalbek-Hermel',
+    'Hermel': 'Baalbek-Hermel',
+    'Beirut': 'Beirut',
+    'Zahlé': 'Beqaa',
+    'Western Beqaa': 'Beqaa',
+    'Rashaya': 'Beqaa',
+    'Keserwan': 'Keserwan-Jbeil',
+    'Byblos': 'Keserwan-Jbeil',
+    'Baabda': 'Mount Lebanon',
+    'Aley': 'Mount Lebanon',
+    'Matn': 'Mount Lebanon',
+    'Chouf': 'Mount Lebanon',
+    'Nabatieh': 'Nabatieh',
+    'Bint Jbeil': 'Nabatieh',
+    'Marjeyoun': 'Nabatieh',
+    'Hasbaya': 'Nabatieh',
+    'Tripoli': 'North',
+    'Zgharta': 'North',
+    'Koura': 'North',
+    'Batroun': 'North',
+    'Bsharri': 'North',
+    'Miniyeh–Danniyeh': 'North',
+    'Sidon': 'South',
+    'Tyre': 'South',
+    'Jezzine': 'South',
+}
+
+UNKNOWN_GOVERNORATE = 'Unknown'
+
+
+def _unrecorded_district(governorate):
+    return f'{governorate} (district not recorded)'
+
+
+def _area_hierarchy(ref_area, area_name):
+    """(governorate, district) for one refArea URI and its cleaned name."""
+    if '_Governorate' in ref_area:
+        districts = [d for d, g in DISTRICT_GOVERNORATE.items() if g == area_name]
+        return area_name, districts[0] if len(districts) == 1 else _unrecorded_district(area_name)
+    return DISTRICT_GOVERNORATE.get(area_name, UNKNOWN_GOVERNORATE), area_name
+
+
+class AggregateCube:
+    """Facility totals at governorate, district and town level, indexed by parent key."""
+
+    def __init__(self, levels):
+        self._levels = levels
+        self._index = {}
+        for level, (frame, parent_col) in levels.items():
+            if parent_col is None:
+                self._index[level] = {None: (0, len(frame))}
+                continue
+            keys = frame[parent_col].to_numpy(dtype=object)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=int)
+            stops = np.r_[starts[1:], len(keys)]
+            self._index[level] = {keys[a]: (a, b) for a, b in zip(starts, stops)}
+
+    @classmethod
+    def from_town_table(cls, town):
+        """Build the cube from a cleaned town table (Town, refArea, Governorate, the four totals)."""
+        ref_area = town['refArea'].astype('category')
+        categories = ref_area.cat.categories
+        codes = ref_area.cat.codes.to_numpy()
+
+        # One hierarchy lookup per distinct refArea, broadcast through the category codes;
+        # the extra trailing slot is what code -1 (missing refArea) indexes
+        governorate_of = np.full(len(categories) + 1, UNKNOWN_GOVERNORATE, dtype=object)
+        district_of = np.full(len(categories) + 1, UNKNOWN_GOVERNORATE, dtype=object)
+        area_names = town['Governorate'].groupby(codes).first()
+        for code, area_name in area_names.items():
+            if code >= 0:
+                governorate_of[code], district_of[code] = _area_hierarchy(str(categories[code]), str(area_name))
+
+        counts = town[FACILITY_TOTALS].to_numpy(dtype=np.int64)
+        towns = pd.DataFrame({
+            'Governorate': governorate_of[codes],
+            'District': district_of[codes],
+            'Town': town['Town'].astype(str).str.strip().to_numpy(dtype=object),
+        })
+        towns[FACILITY_TOTALS] = counts
+        towns['Total Facilities'] = counts.sum(axis=1)
+
+        measures = FACILITY_TOTALS + ['Total Facilities']
+        districts = towns.groupby(['Governorate', 'District'], sort=False)[measures].sum().reset_index()
+        governorates = districts.groupby('Governorate', sort=False)[measures].sum().reset_index()
+
+        levels = {
+            'governorate': (_compact(governorates, ['Governorate']), None),
+            'district': (_compact(districts, ['Governorate', 'District']), 'Governorate'),
+            'town': (_compact(towns, ['Governorate', 'District', 'Town']), 'District'),
+        }
+        return cls(levels)
+
+    def query(self, level, parent=None):
+        """Rows of `level` under `parent` (a governorate for 'district', a district for 'town').
+
+        parent=None returns the whole level. Rows are sorted by Total Facilities, descending.
+        """
+        if level not in self._levels:
+            raise ValueError(f'level must be one of {LEVELS}, got {level!r}')
+        frame, parent_col = self._levels[level]
+        if parent is None:
+            if parent_col is None:
+                return frame
+            return frame.sort_values('Total Facilities', ascending=False, kind='stable')
+        try:
+            start, stop = self._index[level][parent]
+        except KeyError:
+            return frame.iloc[0:0]
+        return frame.iloc[start:stop]
+
+    def children(self, level):
+        """Parent keys available for `level` (e.g. every governorate that has districts)."""
+        return [k for k in self._index[level] if k is not None]
+
+    def memory_usage(self):
+        """Bytes held by all three levels (deep)."""
+        return int(sum(frame.memory_usage(deep=True).sum() for frame, _ in self._levels.values()))
+
+
+def _compact(frame, keys):
+    """Sort by parent key then descending total; categorical keys, int32 counts."""
+    parents = keys[:-1]
+    order_cols = parents + ['Total Facilities']
+    frame = frame.sort_values(order_cols, ascending=[True] * len(parents) + [False], kind='stable')
+    frame = frame.reset_index(drop=True)
+    for key in keys:
+        frame[key] = frame[key].astype('category')
+    for col in FACILITY_TOTALS + ['Total Facilities']:
+        frame[col] = frame[col].astype(np.int32)
+    return frame
+
+
+def load_cube(csv_path=DEFAULT_CSV, cache_dir=None, snapshot_path=None):
+    """Cube for a CSV; with cache_dir the town table comes from tourism_cache, with
+    snapshot_path it is memory-mapped from a town_snapshot file."""
+    if snapshot_path is not None:
+        town = shared_town_table(csv_path, snapshot_path)
+    elif cache_dir is not None:
+        town, _ = tourism_cache.load_cached_tables(csv_path, build_tables, cache_dir=cache_dir)
+    else:
+        town, _ = build_tables(csv_path)
+    return AggregateCube.from_town_table(town)
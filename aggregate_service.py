@@ -0,0 +1,232 @@
+"""aggregate_service.py
+Local HTTP service for the governorate aggregate and the chart's figure JSON.
+
+Dashboards and notebooks that each import visualization_clean re-run
+load_and_prepare() themselves. This service keeps one warm copy per version of
+the CSV instead: the first request after a change parses the file (once, even
+when many requests arrive together), and every later request is served from
+pre-serialized bytes.
+
+Responses carry an ETag derived from the CSV's fingerprint (path, size, mtime),
+so a client that sends If-None-Match gets 304 Not Modified until the file
+changes. Bodies are gzip-compressed for clients that accept it, and requests are
+handled on one thread each (ThreadingHTTPServer). Only the standard library and
+this repo are used.
+
+Endpoints:
+    /aggregate        the aggregate table as JSON (a list of row objects)
+    /aggregate.csv    the same table as CSV
+    /figure           the make_clean_bar() figure as plotly JSON
+
+Usage:
+    server = make_server(AggregateStore('data/tourism.csv'), port=0)   # port 0: any free port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+Run: python aggregate_service.py [CSV] [--host 127.0.0.1] [--port 8325]
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import tourism_cache
+from visualization_clean import DEFAULT_CSV, aggregate_text, load_and_prepare, make_clean_bar
+
+
+DEFAULT_PORT = 8325
+
+# Path -> (resource name, content type)
+ROUTES = {
+    '/aggregate': ('aggregate.json', 'application/json; charset=utf-8'),
+    '/aggregate.json': ('aggregate.json', 'application/json; charset=utf-8'),
+    '/aggregate.csv': ('aggregate.csv', 'text/csv; charset=utf-8'),
+    '/figure': ('figure.json', 'application/json'),
+    '/figure.json': ('figure.json', 'application/json'),
+}
+
+
+class Representation:
+    """One resource of one data version: body bytes, its gzip form and their ETags."""
+    __slots__ = ('body', 'gzip_body', 'etag', 'gzip_etag')
+
+    def __init__(self, body, fingerprint, name):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        # Strong ETags must differ between encodings of the same content
+        self.etag = f'"{fingerprint}-{name}"'
+        self.gzip_etag = f'"{fingerprint}-{name}-gzip"'
+
+
+class AggregateStore:
+    """Warm aggregate for one CSV, reloaded when the file's fingerprint changes.
+
+    get() stats the file on every call (no content hash) and reloads at most once
+    per change: concurrent callers wait on one lock while a single thread parses.
+    The figure is built on its first request, so a service that only serves the
+    table never imports plotly.
+    """
+
+    def __init__(self, csv_path=DEFAULT_CSV, cache_dir=None):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.loads = 0                 # CSV versions loaded so far
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._agg = self._summary = None
+        self._representations = {}
+
+    def fingerprint(self):
+        if not os.path.exists(self.csv_path):
+            return 'sample-data'
+        return tourism_cache.file_fingerprint(self.csv_path, content_hash=False)
+
+    def get(self, name):
+        """Representation of `name` ('aggregate.json', 'aggregate.csv' or 'figure.json') for the current data."""
+        fingerprint = self.fingerprint()
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._agg, self._summary = load_and_prepare(self.csv_path, cache_dir=self.cache_dir,
+                                                            with_summary=True)
+                self._fingerprint = fingerprint
+                self._representations = {}
+                self.loads += 1
+            representation = self._representations.get(name)
+            if representation is None:
+                representation = Representation(self._render(name), fingerprint, name)
+                self._representations[name] = representation
+            return representation
+
+    def _render(self, name):
+        if name == 'aggregate.json':
+            return aggregate_text(self._agg, 'json').encode('utf-8')
+        if name == 'aggregate.csv':
+            return aggregate_text(self._agg, 'csv').encode('utf-8')
+        if name == 'figure.json':
+            return make_clean_bar(self._agg, summary=self._summary).to_json().encode('utf-8')
+        raise KeyError(name)
+
+
+def accepts_gzip(accept_encoding):
+    """True when an Accept-Encoding header allows gzip (explicitly or via *, with q > 0)."""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def etag_matches(if_none_match, etags):
+    """True when an If-None-Match header matches any of `etags` (weak comparison, * matches all)."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in candidates or any(tag in candidates for tag in etags)
+
+
+class AggregateHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler for ROUTES; the store is self.server.store."""
+    server_version = 'TourismAggregate/1'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        route = ROUTES.get(urlsplit(self.path).path.rstrip('/') or '/')
+        if route is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': 'not found', 'endpoints': sorted(ROUTES)}, send_body)
+            return
+        name, content_type = route
+        try:
+            representation = self.server.store.get(name)
+        except Exception as exc:
+            self.log_error('could not load %s: %r', name, exc)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(exc)}, send_body)
+            return
+
+        use_gzip = accepts_gzip(self.headers.get('Accept-Encoding'))
+        etag = representation.gzip_etag if use_gzip else representation.etag
+        if etag_matches(self.headers.get('If-None-Match'), (representation.etag, representation.gzip_etag)):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        body = representation.gzip_body if use_gzip else representation.body
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self._send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')  # may be stored, but revalidate every time
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def _send_json(self, status, payload, send_body):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(store, host='127.0.0.1', port=DEFAULT_PORT, verbose=False):
+    """A ThreadingHTTPServer serving `store` (not started; call serve_forever())."""
+    server = ThreadingHTTPServer((host, port), AggregateHandler)
+    server.daemon_threads = True
+    server.store = store
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the governorate aggregate and figure JSON over HTTP.')
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-dir', default=None,
+                        help=f'reuse cached aggregates across restarts (e.g. {tourism_cache.DEFAULT_CACHE_DIR})')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    store = AggregateStore(args.csv, cache_dir=args.cache_dir)
+    server = make_server(store, args.host, args.port, verbose=args.verbose)
+    store.get('aggregate.json')  # warm up before the first client arrives
+    host, port = server.server_address[:2]
+    print(f"✓ Serving {args.csv} on http://{host}:{port}/ ({', '.join(sorted(ROUTES))})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""atomic_file.py
+Atomic file replacement shared by every writer in the repo.
+
+atomic_write() opens a temp file next to the destination and os.replace()s it
+into place only once the body has been written, so readers (other workers, a
+static web server) never see a half-written file. Temp names carry a random
+suffix, so several threads or processes rebuilding the same file at once each
+write their own temp file and the last replace wins with a complete file.
+
+Usage:
+    with atomic_write('charts/akkar.html') as f:              # binary
+        f.write(data)
+    with atomic_write('state.json', 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+"""
+import os
+import uuid
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, mode='wb', **open_kwargs):
+    """Context manager yielding a file that replaces `path` when the block completes.
+
+    `mode` is 'wb' or 'w' (opened exclusively on the temp name, so the file gets
+    the usual umask permissions). On an exception the temp file is removed and
+    `path` is left untouched. The destination directory must exist.
+    """
+    if mode not in ('w', 'wb'):
+        raise ValueError(f"mode must be 'w' or 'wb', got {mode!r}")
+    tmp = f'{path}.{os.getpid()}.{uuid.uuid4().hex[:12]}.tmp'
+    try:
+        with open(tmp, mode.replace('w', 'x'), **open_kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,208 @@
+"""batch_render.py
+Render the governorate chart for many CSV snapshots (and facility subsets) in parallel.
+
+Every input file x subset pair becomes one task: load_and_prepare, make_clean_bar
+and write_html. Tasks are fanned out over a process pool whose workers import
+pandas and plotly once and then serve many files, instead of paying interpreter
+and import start-up for each file as a shell loop does. A manifest.json with
+per-task timings is written next to the HTML files.
+
+Run:
+    python batch_render.py data/ --out-dir charts --workers 4 --assets charts/assets --gzip
+    python batch_render.py "snapshots/*.csv" --subset lodging=hotels,guest_houses --subset dining=restaurants,cafes
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from html_export import ensure_plotlyjs, write_shared_html
+from visualization_clean import load_and_prepare, make_clean_bar, select_facilities
+
+
+# CLI facility keys -> aggregate columns
+FACILITY_KEYS = {
+    'hotels': 'Total Hotels',
+    'restaurants': 'Total Restaurants',
+    'cafes': 'Total Cafes',
+    'guest_houses': 'Total Guest Houses',
+}
+
+
+def expand_inputs(patterns):
+    """CSV paths for a mix of directories (all *.csv inside) and glob patterns, deduplicated."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '*.csv'))
+        else:
+            matches = glob.glob(pattern)
+        paths.extend(sorted(matches))
+    return list(dict.fromkeys(paths))
+
+
+def parse_subset(spec):
+    """'lodging=hotels,guest_houses' -> ('lodging', ['Total Hotels', 'Total Guest Houses'])."""
+    name, sep, keys = spec.partition('=')
+    if not sep or not name or not keys:
+        raise argparse.ArgumentTypeError(f"expected NAME=key[,key...], got {spec!r}")
+    try:
+        columns = [FACILITY_KEYS[k.strip()] for k in keys.split(',')]
+    except KeyError as e:
+        raise argparse.ArgumentTypeError(f"unknown facility {e.args[0]!r}; choose from {', '.join(FACILITY_KEYS)}")
+    return name, columns
+
+
+def render_one(csv_path, out_path, columns=None, asset_dir=None, gzip_copy=False):
+    """Render one chart. Returns a manifest record with per-stage timings (seconds).
+
+    With asset_dir set, the page references a shared plotly.js there (see
+    html_export) instead of inlining it; gzip_copy adds a .html.gz sibling.
+    """
+    record = {'csv': csv_path, 'output': out_path, 'columns': columns, 'pid': os.getpid()}
+    start = time.perf_counter()
+    try:
+        agg = load_and_prepare(csv_path)
+        if columns:
+            agg = select_facilities(agg, columns)
+        loaded = time.perf_counter()
+        fig = make_clean_bar(agg)
+        built = time.perf_counter()
+        if asset_dir:
+            write_shared_html(fig, out_path, asset_dir, gzip_copy=gzip_copy)
+        else:
+            fig.write_html(out_path)
+        written = time.perf_counter()
+    except Exception as e:  # one bad file must not sink the whole batch
+        record.update(status='error', error=f'{type(e).__name__}: {e}', total_s=time.perf_counter() - start)
+        return record
+
+    record.update(
+        status='ok',
+        categories=len(agg),
+        load_s=loaded - start,
+        build_s=built - loaded,
+        write_s=written - built,
+        total_s=written - start,
+        bytes=os.path.getsize(out_path),
+    )
+    return record
+
+
+def _warm_worker():
+    """Process-pool initializer: load plotly's figure/validator machinery once per worker."""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    go.Figure(go.Bar(x=[0], y=[0]), layout=dict(template=pio.templates['plotly_white']))
+
+
+def output_stems(csv_paths):
+    """Output file stem per input: the file stem, or for stems shared by several inputs
+    (x/s.csv, y/s.csv) their path below the common directory joined with '__' (x__s, y__s)."""
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in csv_paths]
+    shared = {stem for stem in stems if stems.count(stem) > 1}
+    if not shared:
+        return stems
+    clashing = [os.path.abspath(p) for p, stem in zip(csv_paths, stems) if stem in shared]
+    root = os.path.commonpath([os.path.dirname(p) for p in clashing])
+    return [
+        os.path.splitext(os.path.relpath(os.path.abspath(p), root))[0].replace(os.sep, '__') if stem in shared else stem
+        for p, stem in zip(csv_paths, stems)
+    ]
+
+
+def plan_tasks(csv_paths, out_dir, subsets=(), include_all=True):
+    """(csv_path, out_path, columns) for every file x subset combination.
+
+    Raises ValueError if two tasks would still write the same file (e.g. a
+    subset name given twice), since the later one would silently overwrite it.
+    """
+    variants = ([(None, None)] if include_all else []) + list(subsets)
+    tasks = []
+    for csv_path, stem in zip(csv_paths, output_stems(csv_paths)):
+        for name, columns in variants:
+            suffix = f'__{name}' if name else ''
+            tasks.append((csv_path, os.path.join(out_dir, f'{stem}{suffix}.html'), columns))
+
+    seen = {}
+    for csv_path, out_path, _ in tasks:
+        if out_path in seen:
+            raise ValueError(f'{seen[out_path]} and {csv_path} would both be written to {out_path}')
+        seen[out_path] = csv_path
+    return tasks
+
+
+def render_batch(csv_paths, out_dir, subsets=(), include_all=True, workers=None, manifest_path=None,
+                 asset_dir=None, gzip_copy=False):
+    """Render all tasks over `workers` processes (1 = in-process) and write the manifest.
+
+    Returns the manifest dict.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if asset_dir:
+        ensure_plotlyjs(asset_dir, gzip_copy=gzip_copy)  # once, before workers race for it
+    tasks = [task + (asset_dir, gzip_copy) for task in plan_tasks(csv_paths, out_dir, subsets, include_all)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    if workers == 1 or len(tasks) <= 1:
+        records = [render_one(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_warm_worker) as pool:
+            futures = [pool.submit(render_one, *task) for task in tasks]
+            records = [f.result() for f in as_completed(futures)]
+        records.sort(key=lambda r: r['output'])
+
+    manifest = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'workers': workers,
+        'tasks': len(tasks),
+        'failed': sum(r['status'] != 'ok' for r in records),
+        'wall_s': time.perf_counter() - start,
+        'files': records,
+    }
+    manifest_path = manifest_path or os.path.join(out_dir, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the governorate chart for many CSV snapshots in parallel.')
+    parser.add_argument('inputs', nargs='+', help='CSV files, directories or glob patterns')
+    parser.add_argument('-o', '--out-dir', default='charts')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--subset', type=parse_subset, action='append', default=[], metavar='NAME=KEYS',
+                        help=f"extra chart over a facility subset; keys: {', '.join(FACILITY_KEYS)}")
+    parser.add_argument('--subsets-only', action='store_true', help='skip the all-facilities chart')
+    parser.add_argument('--manifest', default=None, help='manifest path (default: OUT_DIR/manifest.json)')
+    parser.add_argument('--assets', default=None, metavar='DIR',
+                        help='write plotly.js once to DIR and reference it instead of inlining it per file')
+    parser.add_argument('--gzip', action='store_true', help='also write pre-compressed .html.gz files')
+    args = parser.parse_args(argv)
+
+    csv_paths = expand_inputs(args.inputs)
+    if not csv_paths:
+        parser.error('no CSV files matched')
+
+    try:
+        plan_tasks(csv_paths, args.out_dir, args.subset, not args.subsets_only)
+    except ValueError as e:
+        parser.error(str(e))
+
+    manifest = render_batch(csv_paths, args.out_dir, args.subset, not args.subsets_only,
+                            args.workers, args.manifest, args.assets, args.gzip)
+    print(f"✓ {manifest['tasks'] - manifest['failed']}/{manifest['tasks']} charts written to {args.out_dir} "
+          f"in {manifest['wall_s']:.2f}s with {manifest['workers']} workers")
+    for record in manifest['files']:
+        if record['status'] != 'ok':
+            print(f"✗ {record['csv']}: {record['error']}", file=sys.stderr)
+    return 1 if manifest['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""bench_bar_traces.py
+Compare single-trace vs per-bar-trace rendering in make_clean_bar.
+
+For each category count, builds the figure in both modes with every bar drawn,
+and in single-trace mode under the default render budget (MAX_BARS, top-K plus
+"Other"), and reports the build time and the size of the serialized figure JSON.
+
+Run: python benchmarks/bench_bar_traces.py [--sizes 25 1000 10000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from visualization_clean import MAX_BARS, make_clean_bar  # noqa: E402
+
+
+def synthetic_aggregate(n, seed=0):
+    """Sorted aggregate table with n categories, shaped like load_and_prepare() output."""
+    rng = np.random.default_rng(seed)
+    totals = np.sort(rng.integers(1, 700, size=n))[::-1]
+    return pd.DataFrame({
+        'Governorate': [f'Area {i:05d}' for i in range(n)],
+        'Total Facilities': totals,
+    })
+
+
+def measure(agg, single_trace, max_bars=None):
+    start = time.perf_counter()
+    fig = make_clean_bar(agg, single_trace=single_trace, max_bars=max_bars)
+    build_s = time.perf_counter() - start
+    return build_s, len(fig.to_json())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25, 1000, 10000])
+    args = parser.parse_args(argv)
+
+    make_clean_bar(synthetic_aggregate(5))  # warm up plotly validators
+    print(f"{'categories':>10}  {'mode':<12} {'build (s)':>10} {'JSON (bytes)':>14}")
+    for n in args.sizes:
+        agg = synthetic_aggregate(n)
+        for label, single, max_bars in (('single', True, None), ('per-bar', False, None),
+                                        (f'top-{MAX_BARS}', True, MAX_BARS)):
+            build_s, size = measure(agg, single, max_bars)
+            print(f"{n:>10}  {label:<12} {build_s:>10.3f} {size:>14,}")
+
+
+if __name__ == '__main__':
+    main()
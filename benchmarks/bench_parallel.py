@@ -0,0 +1,65 @@
+"""bench_parallel.py
+Scaling report for parallel_aggregate (byte-range shards on a process pool).
+
+Generates a synthetic CSV once (reused from --data-dir), times the serial
+load_and_prepare path, then parallel_aggregate with each worker count, checking
+that every result is identical to the serial aggregate. Speed-up is relative to
+the serial path; efficiency is speed-up / workers. Worker counts above the
+host's core count cannot scale and are marked.
+
+Run: python benchmarks/bench_parallel.py [--rows 1000000] [--workers 1 2 4 8] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from visualization_clean import load_and_prepare, parallel_aggregate  # noqa: E402
+
+from synthetic import write_synthetic_csv  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--distinct', type=int, default=25)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'tourism_bench'))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    csv_path = os.path.join(args.data_dir, f'synthetic_{args.rows}_{args.distinct}.csv')
+    if not os.path.exists(csv_path):
+        write_synthetic_csv(csv_path, args.rows, args.distinct)
+    cores = os.cpu_count() or 1
+    print(f"{csv_path}: {args.rows:,} rows, {os.path.getsize(csv_path) / 1e6:,.1f} MB, {cores} core(s)")
+
+    serial_s, expected = best_of(lambda: load_and_prepare(csv_path), args.repeat)
+    print(f"\n{'mode':<12} {'seconds':>9} {'rows/s':>12} {'speed-up':>9} {'efficiency':>11}")
+    print(f"{'serial':<12} {serial_s:>9.3f} {args.rows / serial_s:>12,.0f} {1.0:>8.2f}x {'':>11}")
+    for workers in args.workers:
+        seconds, agg = best_of(lambda: parallel_aggregate(csv_path, workers=workers), args.repeat)
+        pd.testing.assert_frame_equal(agg, expected)
+        speedup = serial_s / seconds
+        note = '  (> cores)' if workers > cores else ''
+        print(f"{f'{workers} worker' + 's' * (workers > 1):<12} {seconds:>9.3f} {args.rows / seconds:>12,.0f} "
+              f"{speedup:>8.2f}x {speedup / workers:>10.0%}{note}")
+    print("\n✓ every parallel result is identical to the serial aggregate")
+
+
+if __name__ == '__main__':
+    main()
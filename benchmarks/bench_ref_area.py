@@ -0,0 +1,63 @@
+"""bench_ref_area.py
+Micro-benchmark of the refArea -> Governorate cleanup.
+
+Compares the original four chained .str.replace passes over every row with
+normalize_ref_area, which cleans each distinct URI once and maps the names back
+through the category codes. Inputs are categorical, as read_tourism_csv loads them.
+
+Run: python benchmarks/bench_ref_area.py [--rows 1000 100000 1000000] [--distinct 25]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from visualization_clean import DEFAULT_CSV, _repair_mojibake, normalize_ref_area  # noqa: E402
+
+
+def chained_replace(ref_area):
+    """The pre-normalization cleanup, kept here as the baseline."""
+    s = ref_area.astype(str).str.replace('https://dbpedia.org/page/', '', regex=False)
+    s = s.str.replace('http://dbpedia.org/resource/', '', regex=False)
+    s = s.str.replace('_Governorate|_District.*', '', regex=True)
+    return s.str.replace('_', ' ')
+
+
+def distinct_uris(n):
+    uris = pd.read_csv(DEFAULT_CSV, usecols=['refArea'])['refArea'].unique().tolist() if os.path.exists(DEFAULT_CSV) else []
+    uris += [f'http://dbpedia.org/resource/Synthetic_{i}_District' for i in range(max(0, n - len(uris)))]
+    return uris[:n]
+
+
+def best_of(fn, arg, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--distinct', type=int, default=25)
+    args = parser.parse_args(argv)
+
+    uris = np.array(distinct_uris(args.distinct), dtype=object)
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10} {'chained (ms)':>14} {'normalized (ms)':>16} {'speedup':>9}")
+    for n in args.rows:
+        ref_area = pd.Series(uris[rng.integers(0, len(uris), size=n)]).astype('category')
+        assert chained_replace(ref_area).map(_repair_mojibake).tolist() == normalize_ref_area(ref_area).tolist()
+        old = best_of(chained_replace, ref_area)
+        new = best_of(normalize_ref_area, ref_area)
+        print(f"{n:>10} {old * 1e3:>14.2f} {new * 1e3:>16.2f} {old / new:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""bench_service.py
+What a consumer pays for the governorate aggregate: recomputing it vs asking aggregate_service.
+
+Starts the service in-process on a free localhost port and reports medians of:
+- recompute         load_and_prepare() in the consumer (what every notebook did)
+- GET 200           full response from the warm service (identity / gzip)
+- GET 304           revalidation with If-None-Match (the steady state for caching clients)
+plus the wall time of N concurrent cold requests and how many CSV loads they caused.
+
+Run: python benchmarks/bench_service.py [CSV] [--runs 50] [--clients 16]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregate_service import AggregateStore, make_server  # noqa: E402
+from visualization_clean import DEFAULT_CSV, load_and_prepare  # noqa: E402
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    store = AggregateStore(args.csv)
+    server = make_server(store, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/aggregate'
+
+    def get(**headers):
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as resp:
+            return resp.headers.get('ETag'), resp.read()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(lambda _: get(), range(args.clients)))
+    cold = time.perf_counter() - start
+
+    etag, body = get()
+    recompute = timed(lambda: load_and_prepare(args.csv), args.runs)
+    identity = timed(get, args.runs)
+    gzipped = timed(lambda: get(**{'Accept-Encoding': 'gzip'}), args.runs)
+    _, gz_body = get(**{'Accept-Encoding': 'gzip'})
+
+    def revalidate():
+        try:
+            get(**{'If-None-Match': etag})
+        except urllib.error.HTTPError as exc:  # urllib reports 304 as an error
+            assert exc.code == 304
+
+    not_modified = timed(revalidate, args.runs)
+    server.shutdown()
+
+    print(f"{args.clients} concurrent cold requests: {cold * 1000:.1f} ms wall, {store.loads} CSV load(s)")
+    print(f"median of {args.runs}:")
+    print(f"  recompute in consumer   {recompute:8.2f} ms")
+    print(f"  GET 200 identity        {identity:8.2f} ms  ({len(body):,} bytes)")
+    print(f"  GET 200 gzip            {gzipped:8.2f} ms  ({len(gz_body):,} bytes)")
+    print(f"  GET 304 If-None-Match   {not_modified:8.2f} ms  (0 bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""bench_startup.py
+Process start-up cost of visualization_clean, from `python -X importtime`.
+
+Runs fresh interpreters and reports medians of:
+- import           cumulative import time of visualization_clean
+- pandas / plotly  the part of that spent importing pandas / plotly.graph_objects
+                   (0 when the module does not import it)
+- data-only run    wall time of `visualization_clean.py --format json` (cron usage)
+
+Run: python benchmarks/bench_startup.py [--runs 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LINE = re.compile(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)')
+
+
+def importtime(code):
+    """{top-level or direct-child module: cumulative microseconds} for one fresh interpreter."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for match in _LINE.finditer(proc.stderr):
+        cumulative, indent, name = int(match.group(1)), len(match.group(2)), match.group(3)
+        if indent <= 3:  # the module itself and what it imports directly
+            times[name] = times.get(name, 0) + cumulative
+    return times
+
+
+def data_only_run(out_path):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'visualization_clean.py', '--format', 'json', '-o', out_path],
+                   cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    samples = [importtime('import visualization_clean') for _ in range(args.runs)]
+    out_path = os.path.join(tempfile.gettempdir(), 'bench_startup.json')
+    runs = [data_only_run(out_path) for _ in range(args.runs)]
+
+    def median_ms(key):
+        return statistics.median(s.get(key, 0) for s in samples) / 1000
+
+    print(f"median of {args.runs} fresh interpreters:")
+    print(f"  import visualization_clean  {median_ms('visualization_clean'):8.1f} ms")
+    print(f"    pandas                    {median_ms('pandas'):8.1f} ms")
+    print(f"    plotly.graph_objects      {median_ms('plotly.graph_objects'):8.1f} ms")
+    print(f"    concurrent.futures        {median_ms('concurrent.futures'):8.1f} ms")
+    print(f"  --format json run (wall)    {statistics.median(runs) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""run_benchmarks.py
+Benchmark suite for the chart pipeline's hot paths on synthetic tourism CSVs.
+
+For every size (1k, 100k, 1M and 10M rows by default) a synthetic CSV is
+generated once into --data-dir and reused by later runs. Four stages are timed
+separately:
+- load_and_prepare   CSV parse, refArea cleanup and groupby
+- make_clean_bar     figure construction
+- to_json            figure JSON serialization
+- write_html         HTML export (plotly.js inlined, as main() does)
+
+Wall time is the best of --repeat untraced runs. Peak memory comes from one
+extra run in a forked child process: peak_mb is how far the child's peak RSS
+(getrusage ru_maxrss) rose above its RSS at fork, so it includes the Arrow memory
+pool and other native allocations, and traced_mb is the Python-heap peak of the
+same run under tracemalloc. Where fork() is unavailable (Windows) the extra run
+happens in-process and peak_mb is the traced peak plus the growth of the Arrow
+pool's high-water mark.
+Results are written as JSON; pass --baseline with an earlier results file to
+print per-stage ratios and flag regressions.
+
+Run: python benchmarks/run_benchmarks.py [--sizes 1k 100k] [--distinct 25] [--out bench_results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+import plotly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from visualization_clean import load_and_prepare, make_clean_bar  # noqa: E402
+
+from synthetic import SIZES, write_synthetic_csv  # noqa: E402
+
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# ru_maxrss is in bytes on macOS and in KiB elsewhere
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _arrow_peak():
+    return pa.default_memory_pool().max_memory() if pa is not None else 0
+
+
+def _traced_run(fn):
+    """(peak traced bytes, Arrow pool high-water growth in bytes) of one run of fn."""
+    arrow_before = _arrow_peak()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, max(_arrow_peak() - arrow_before, 0)
+
+
+def _forked_peaks(fn):
+    """(peak RSS growth in bytes, peak traced bytes) of one run of fn in a forked child.
+
+    Linux resets a forked child's ru_maxrss to its RSS at fork, so the growth is
+    what this stage itself allocated, Python heap and native memory alike.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            traced, _ = _traced_run(fn)
+            rss = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start) * _MAXRSS_UNIT
+            os.write(write_fd, struct.pack('<qq', rss, traced))
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as f:
+        payload = f.read()
+    _, status = os.waitpid(pid, 0)
+    if status or len(payload) != 16:
+        raise RuntimeError(f'memory measurement child failed (wait status {status})')
+    return struct.unpack('<qq', payload)
+
+
+def measure(fn, repeat):
+    """(best wall seconds over `repeat` runs, peak MB, peak traced MB, last result)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    if hasattr(os, 'fork') and resource is not None:
+        peak, traced = _forked_peaks(fn)
+    else:
+        traced, arrow = _traced_run(fn)
+        peak = traced + arrow
+    return best, peak / 1e6, traced / 1e6, result
+
+
+def bench_size(csv_path, rows, distinct, repeat, out_dir):
+    """Stage records for one synthetic CSV."""
+    html_path = os.path.join(out_dir, f'bench_{rows}_{distinct}.html')
+    records = []
+
+    def record(stage, fn):
+        wall, peak, traced, result = measure(fn, repeat)
+        records.append({'rows': rows, 'distinct': distinct, 'stage': stage, 'wall_s': round(wall, 6),
+                        'peak_mb': round(peak, 3), 'traced_mb': round(traced, 3)})
+        print(f"{rows:>10,} {distinct:>8} {stage:<18} {wall:>10.4f} {peak:>10.1f} {traced:>11.1f}")
+        return result
+
+    agg = record('load_and_prepare', lambda: load_and_prepare(csv_path))
+    fig = record('make_clean_bar', lambda: make_clean_bar(agg))
+    record('to_json', fig.to_json)
+    record('write_html', lambda: fig.write_html(html_path))
+    return records
+
+
+def compare(results, baseline_path, threshold):
+    """Print current/baseline wall-time ratios; returns the number of regressions."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['rows'], r['distinct'], r['stage']): r for r in json.load(f)['results']}
+    regressions = 0
+    print(f"\n{'rows':>10} {'distinct':>8} {'stage':<18} {'ratio':>8}")
+    for r in results:
+        old = baseline.get((r['rows'], r['distinct'], r['stage']))
+        if not old or not old['wall_s']:
+            continue
+        ratio = r['wall_s'] / old['wall_s']
+        flag = '  REGRESSION' if ratio > 1 + threshold else ''
+        regressions += bool(flag)
+        print(f"{r['rows']:>10,} {r['distinct']:>8} {r['stage']:<18} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark load/build/serialize/export on synthetic CSVs.')
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), help=f"row counts or labels ({', '.join(SIZES)})")
+    parser.add_argument('--distinct', type=int, nargs='+', default=[25], help='distinct refArea values')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'tourism_bench'))
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', default=None, help='earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown ratio counted as a regression')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    print(f"{'rows':>10} {'distinct':>8} {'stage':<18} {'wall (s)':>10} {'peak (MB)':>10} {'traced (MB)':>11}")
+    results = []
+    for size in args.sizes:
+        rows = SIZES.get(size) or int(size)
+        for distinct in args.distinct:
+            csv_path = os.path.join(args.data_dir, f'synthetic_{rows}_{distinct}.csv')
+            if not os.path.exists(csv_path):
+                write_synthetic_csv(csv_path, rows, distinct)
+            results.extend(bench_size(csv_path, rows, distinct, args.repeat, args.data_dir))
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ results written to {args.out}")
+
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
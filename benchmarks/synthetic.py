@@ -0,0 +1,128 @@
+"""synthetic.py
+Synthetic tourism CSVs with the same 22-column schema as the bundled dataset.
+
+Rows are generated in vectorized chunks and appended to the file, so even the
+10M-row size never holds more than one chunk in memory. refArea is drawn from
+the real governorate/district URIs, topped up with synthetic district URIs when
+more distinct values are requested.
+
+Run: python benchmarks/synthetic.py OUT.csv --rows 1000000 [--distinct 25] [--seed 0]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atomic_file import atomic_write  # noqa: E402
+from visualization_clean import DEFAULT_CSV  # noqa: E402
+
+
+# Column order of data/551015b5649368dd2612f795c2a9c2d8_20240902_115953.csv
+COLUMNS = [
+    'Existence of initiatives and projects in the past five years to improve the tourism sector - exists',
+    'Existence of cafes - does not exist',
+    'Tourism Index',
+    'Existence of touristic attractions that can be expolited and developed - does not exist',
+    'Existence of touristic attractions prone to be exploited and developed - exists',
+    'Total number of hotels',
+    'Town',
+    'Total number of cafes',
+    'Observation URI',
+    'Existence of hotels - does not exist',
+    'Existence of restaurants - does not exist',
+    'Existence of cafes - exists',
+    'references',
+    'Existence of hotels - exists',
+    'refArea',
+    'Total number of guest houses',
+    'Total number of restaurants',
+    'publisher',
+    'dataset',
+    'Existence of guest houses - exists',
+    'Existence of guest houses - does not exist',
+    'Existence of restaurants - exists',
+]
+
+# facility key -> (count column, mean count, "exists" flag, "does not exist" flag)
+_FACILITIES = {
+    'hotels': ('Total number of hotels', 0.4,
+               'Existence of hotels - exists', 'Existence of hotels - does not exist'),
+    'restaurants': ('Total number of restaurants', 3.0,
+                    'Existence of restaurants - exists', 'Existence of restaurants - does not exist'),
+    'cafes': ('Total number of cafes', 1.5,
+              'Existence of cafes - exists', 'Existence of cafes - does not exist'),
+    'guest_houses': ('Total number of guest houses', 0.5,
+                     'Existence of guest houses - exists', 'Existence of guest houses - does not exist'),
+}
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+
+_CHUNK_ROWS = 500_000
+
+
+def ref_area_pool(distinct):
+    """`distinct` refArea URIs: the real ones first, then synthetic districts."""
+    real = []
+    if os.path.exists(DEFAULT_CSV):
+        real = pd.read_csv(DEFAULT_CSV, usecols=['refArea'])['refArea'].drop_duplicates().tolist()
+    synthetic = (f'http://dbpedia.org/resource/Synthetic_{i}_District' for i in range(distinct))
+    pool = real[:distinct]
+    pool += [next(synthetic) for _ in range(distinct - len(pool))]
+    return np.array(pool, dtype=object)
+
+
+def synthetic_chunk(start, rows, areas, rng):
+    """DataFrame of `rows` synthetic observations numbered from `start`."""
+    ids = np.arange(start, start + rows)
+    town = np.char.add('Town ', ids.astype(str)).astype(object)
+    data = {
+        'Town': town,
+        'Observation URI': np.char.add('http://linked.aub.edu.lb/CODEC/Lebanon/observation/Tourism-Town+',
+                                       ids.astype(str)).astype(object),
+        'refArea': areas[rng.integers(0, len(areas), size=rows)],
+        'Tourism Index': rng.integers(0, 11, size=rows),
+        'references': 'https://impact.cib.gov.lb/home#open_data_section',
+        'publisher': 'Impact Open Data',
+        'dataset': 'http://linked.aub.edu.lb/CODEC/Lebanon/Dataset/Tourism-Lebanon-2023',
+        COLUMNS[0]: rng.integers(0, 2, size=rows),
+        COLUMNS[3]: rng.integers(0, 2, size=rows),
+        COLUMNS[4]: rng.integers(0, 2, size=rows),
+    }
+    for count_col, mean, exists_col, missing_col in _FACILITIES.values():
+        counts = rng.poisson(mean, size=rows)
+        data[count_col] = counts
+        data[exists_col] = (counts > 0).astype(np.int8)
+        # like the real data, "does not exist" is only recorded for some towns without the facility
+        data[missing_col] = ((counts == 0) & (rng.random(rows) < 0.7)).astype(np.int8)
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def write_synthetic_csv(path, rows, distinct=25, seed=0):
+    """Write a synthetic CSV of `rows` rows with `distinct` refArea values. Returns path."""
+    rng = np.random.default_rng(seed)
+    areas = ref_area_pool(distinct)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with atomic_write(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, max(rows, 1), _CHUNK_ROWS):
+            n = min(_CHUNK_ROWS, rows - start)
+            chunk = synthetic_chunk(start, n, areas, rng)
+            chunk.to_csv(f, header=start == 0, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic tourism CSV.')
+    parser.add_argument('out')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--distinct', type=int, default=25, help='number of distinct refArea values')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    write_synthetic_csv(args.out, args.rows, args.distinct, args.seed)
+    print(f"✓ {args.out}: {args.rows:,} rows, {args.distinct} distinct refArea values")
+
+
+if __name__ == '__main__':
+    main()
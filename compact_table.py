@@ -0,0 +1,159 @@
+"""compact_table.py
+Compact in-memory representation of the town-level table.
+
+prepare_town_table() keeps every count as int64 and every name as a Python
+object column, and a full read holds all 22 raw columns. For long-lived
+dashboard workers the compact form is a fraction of that:
+- unused columns (Tourism Index, publisher, dataset, references, ...) are never parsed
+- each facility count uses the smallest unsigned integer type that fits (usually uint8)
+- Governorate, Town and refArea are categoricals
+- the "Existence of ..." 0/1 flags are bit-packed into one unsigned integer
+  column, 'Existence Flags' (bit i is attrs['flag_columns'][i]); unpack_flags()
+  restores them. A flag column holding anything but 0/1 (the bundled file has a
+  -1 in one of them) is kept as its own int8 column instead, so nothing is lost
+
+The compact table has the same columns as the cleaned town table, so
+aggregate_by_governorate() and aggregate_cube.AggregateCube accept it unchanged.
+
+Run: python compact_table.py [CSV]    # memory_usage(deep=True) before/after report
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from visualization_clean import (
+    DEFAULT_CSV, FACILITY_TOTALS, TOWN_TABLE_DTYPES,
+    prepare_town_table, read_tourism_csv,
+)
+
+
+FLAG_PREFIX = 'Existence of '
+FLAG_COLUMN = 'Existence Flags'
+
+_CATEGORY_COLUMNS = ['Governorate', 'Town', 'refArea']
+_FLAG_DTYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+
+def flag_columns(columns):
+    """The "Existence of ..." columns among `columns`, in file order."""
+    return [c for c in columns if str(c).startswith(FLAG_PREFIX)]
+
+
+def smallest_unsigned(values, dtypes=_FLAG_DTYPES):
+    """`values` (non-negative integers) as the narrowest numpy unsigned type that holds them.
+
+    `dtypes` lists the candidate types, narrowest first (standalone_page limits
+    them to what JavaScript typed arrays support).
+    """
+    values = np.asarray(values)
+    top = int(values.max()) if len(values) else 0
+    if len(values) and int(values.min()) < 0:
+        raise ValueError('smallest_unsigned expects non-negative values')
+    for dtype in dtypes:
+        if top <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    raise ValueError(f'value {top} does not fit in {np.dtype(dtypes[-1]).name}')
+
+
+def pack_flags(flags):
+    """Bit-pack a frame of 0/1 columns into one unsigned integer per row (bit i = column i)."""
+    n = flags.shape[1]
+    if n > 64:
+        raise ValueError(f'cannot bit-pack {n} flag columns into 64 bits')
+    dtype = next(d for d in _FLAG_DTYPES if np.iinfo(d).bits >= max(n, 1))
+    bits = (flags.fillna(0).to_numpy() != 0).astype(dtype)
+    weights = (np.ones(n, dtype=dtype) << np.arange(n, dtype=dtype)).astype(dtype)
+    return (bits * weights).sum(axis=1, dtype=dtype)
+
+
+def unpack_flags(table, names=None):
+    """The bit-packed flags of a compact table as a frame of uint8 0/1 columns.
+
+    names selects a subset of table.attrs['flag_columns'] (default: all of them).
+    """
+    all_names = table.attrs.get('flag_columns', [])
+    names = all_names if names is None else names
+    packed = table[FLAG_COLUMN].to_numpy()
+    return pd.DataFrame(
+        {name: ((packed >> all_names.index(name)) & 1).astype(np.uint8) for name in names},
+        index=table.index,
+    )
+
+
+def compact_town_table(town, flags=None):
+    """Compact copy of a cleaned town table (see the module docstring).
+
+    `flags` is an optional frame of raw "Existence of ..." columns aligned with
+    `town`; the strictly 0/1 ones are packed into FLAG_COLUMN (their names kept in
+    attrs['flag_columns']), any others become int8 columns. Columns other than
+    Town, refArea, Governorate and the four totals are dropped.
+    """
+    data = {}
+    for col in _CATEGORY_COLUMNS:
+        if col in town.columns:
+            s = town[col]
+            data[col] = s.str.strip().astype('category') if col == 'Town' else s.astype('category')
+    for col in FACILITY_TOTALS:
+        data[col] = smallest_unsigned(town[col].to_numpy())
+
+    names = []
+    if flags is not None and flags.shape[1]:
+        flags = flags.fillna(0)
+        binary = [c for c in flags.columns if flags[c].isin([0, 1]).all()]
+        for col in flags.columns.difference(binary, sort=False):
+            data[col] = pd.to_numeric(flags[col], downcast='integer')
+        if binary:
+            names = [str(c) for c in binary]
+            data[FLAG_COLUMN] = pack_flags(flags[binary])
+
+    compact = pd.DataFrame(data, index=town.index)
+    compact.attrs['flag_columns'] = names
+    return compact
+
+
+def load_compact_town_table(csv_path=DEFAULT_CSV, engine='auto'):
+    """Parse only the needed columns of a CSV (flags as int8) and return the compact table."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    flags = flag_columns(header)
+    raw = read_tourism_csv(csv_path, {**TOWN_TABLE_DTYPES, **{c: 'int8' for c in flags}}, engine=engine)
+    town = prepare_town_table(raw.drop(columns=flags))
+    return compact_town_table(town, raw[flags])
+
+
+def memory_report(csv_path=DEFAULT_CSV):
+    """memory_usage(deep=True) of the default representation vs the compact one.
+
+    'full' is every raw column as inferred by pandas plus the cleaned columns
+    (what an unpruned load holds), 'town' is the cleaned town table from
+    build_tables(), 'compact' is load_compact_town_table(). Values are bytes.
+    """
+    full = prepare_town_table(read_tourism_csv(csv_path))
+    town = prepare_town_table(read_tourism_csv(csv_path, TOWN_TABLE_DTYPES))
+    compact = load_compact_town_table(csv_path)
+    report = {'rows': len(compact)}
+    for label, frame in (('full', full), ('town', town), ('compact', compact)):
+        report[label] = int(frame.memory_usage(deep=True).sum())
+        report[f'{label}_columns'] = {str(c): int(b) for c, b in frame.memory_usage(deep=True).items()}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the memory footprint of the town table representations.')
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    args = parser.parse_args(argv)
+
+    report = memory_report(args.csv)
+    print(f"{report['rows']:,} rows, memory_usage(deep=True):")
+    for label in ('full', 'town', 'compact'):
+        print(f"  {label:<8} {report[label] / 1024:10,.1f} KiB")
+    print(f"✓ compact is {report['compact'] / report['full']:.1%} of full, "
+          f"{report['compact'] / report['town']:.1%} of the cleaned town table")
+    print("\nPer column (compact):")
+    width = max(map(len, report['compact_columns']))
+    for col, size in report['compact_columns'].items():
+        print(f"  {col:<{width}} {size / 1024:8,.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""flag_index.py
+Bitmap index over the "Existence of ..." flags for instant town filtering.
+
+load_and_prepare() keeps only the facility counts, so a filtered view such as
+"towns with attractions but no hotels, per governorate" would need a fresh pass
+over the raw CSV. FlagIndex is built once from the compact town table
+(compact_table.load_compact_town_table) and keeps one packed bitset per flag
+(np.packbits, 1 bit per town). Filters are combined with &, | and ~ on Bitset
+objects, which are vectorized bitwise operations on those packed bytes, and
+FlagIndex.aggregate() turns a selection straight into the governorate
+aggregate (np.bincount over precomputed governorate codes), ready for
+make_clean_bar().
+
+A town's bit is set when its flag is exactly 1 (one column of the bundled file
+also holds -1, which is treated as not set).
+
+Usage:
+    index = load_flag_index()
+    sel = index['touristic attractions prone to be exploited and developed - exists'] & ~index['hotels - exists']
+    sel.count()                      # number of matching towns
+    make_clean_bar(index.aggregate(sel))
+"""
+import numpy as np
+import pandas as pd
+
+from compact_table import FLAG_COLUMN, FLAG_PREFIX, load_compact_town_table
+from visualization_clean import DEFAULT_CSV, FACILITY_TOTALS, finish_aggregate
+
+
+class Bitset:
+    """A packed set of town rows (bit i = row i) supporting &, |, ^ and ~."""
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, bits, size):
+        self.bits = bits
+        self.size = size
+
+    @classmethod
+    def from_mask(cls, mask):
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask), len(mask))
+
+    def _check(self, other):
+        if not isinstance(other, Bitset) or other.size != self.size:
+            raise ValueError('bitsets must come from the same index')
+
+    def __and__(self, other):
+        self._check(other)
+        return Bitset(self.bits & other.bits, self.size)
+
+    def __or__(self, other):
+        self._check(other)
+        return Bitset(self.bits | other.bits, self.size)
+
+    def __xor__(self, other):
+        self._check(other)
+        return Bitset(self.bits ^ other.bits, self.size)
+
+    def __invert__(self):
+        bits = ~self.bits
+        tail = self.size % 8
+        if tail:
+            bits[-1] &= np.uint8(0xFF << (8 - tail) & 0xFF)  # keep the padding bits clear
+        return Bitset(bits, self.size)
+
+    def count(self):
+        """Number of selected rows."""
+        return int(np.unpackbits(self.bits).sum())
+
+    def to_mask(self):
+        """Boolean row mask (length = number of towns)."""
+        return np.unpackbits(self.bits, count=self.size).astype(bool)
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f'Bitset({self.count()} of {self.size})'
+
+
+def flag_label(name):
+    """Short label for a flag column: 'Existence of hotels - exists' -> 'hotels - exists'."""
+    return name[len(FLAG_PREFIX):] if name.startswith(FLAG_PREFIX) else name
+
+
+class FlagIndex:
+    """One Bitset per "Existence of ..." flag, plus what aggregate() needs per town."""
+
+    def __init__(self, bitsets, governorates, governorate_codes, counts):
+        self._bitsets = bitsets                  # short label -> Bitset
+        self.governorates = governorates         # category names, indexed by governorate_codes
+        self._codes = governorate_codes          # int per town, -1 = no governorate
+        self._counts = counts                    # (towns, 4) facility counts, FACILITY_TOTALS order
+        self.size = len(governorate_codes)
+
+    @classmethod
+    def from_compact_table(cls, table):
+        """Index a table from compact_table (bit-packed FLAG_COLUMN and/or int8 flag columns)."""
+        masks = {}
+        if FLAG_COLUMN in table.columns:
+            packed = table[FLAG_COLUMN].to_numpy()
+            for bit, name in enumerate(table.attrs.get('flag_columns', [])):
+                masks[name] = (packed >> bit) & 1 == 1
+        for name in table.columns:
+            if str(name).startswith(FLAG_PREFIX):
+                masks[name] = table[name].to_numpy() == 1
+
+        governorate = table['Governorate'].astype('category')
+        return cls(
+            {flag_label(name): Bitset.from_mask(mask) for name, mask in masks.items()},
+            governorate.cat.categories,
+            governorate.cat.codes.to_numpy(),
+            table[FACILITY_TOTALS].to_numpy(dtype=np.int64),
+        )
+
+    @property
+    def flags(self):
+        """Short labels of the indexed flags (keys for index[...])."""
+        return list(self._bitsets)
+
+    def __getitem__(self, name):
+        key = flag_label(name)
+        try:
+            return self._bitsets[key]
+        except KeyError:
+            raise KeyError(f'unknown flag {name!r}; choose from {self.flags}') from None
+
+    def all(self):
+        """Every town."""
+        return Bitset.from_mask(np.ones(self.size, dtype=bool))
+
+    def select(self, has=(), lacks=(), any_of=()):
+        """Towns with every flag in `has`, none in `lacks` and (if given) at least one in `any_of`."""
+        selection = self.all()
+        for name in has:
+            selection &= self[name]
+        for name in lacks:
+            selection &= ~self[name]
+        if any_of:
+            either = self[any_of[0]]
+            for name in any_of[1:]:
+                either |= self[name]
+            selection &= either
+        return selection
+
+    def aggregate(self, selection=None):
+        """Governorate aggregate (as load_and_prepare returns it) over the selected towns."""
+        mask = self._codes >= 0
+        if selection is not None:
+            mask &= selection.to_mask()
+        codes = self._codes[mask]
+        n = len(self.governorates)
+        sums = np.column_stack([np.bincount(codes, weights=self._counts[mask, j], minlength=n)
+                                for j in range(len(FACILITY_TOTALS))]).astype(np.int64)
+        present = np.bincount(codes, minlength=n) > 0  # groupby only lists governorates with rows
+        frame = pd.DataFrame(sums[present], columns=FACILITY_TOTALS,
+                             index=pd.Index(np.asarray(self.governorates, dtype=object)[present], name='Governorate'))
+        return finish_aggregate(frame)
+
+
+def load_flag_index(csv_path=DEFAULT_CSV):
+    """Parse the CSV once (compact, flags included) and index its flags."""
+    return FlagIndex.from_compact_table(load_compact_town_table(csv_path))
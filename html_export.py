@@ -0,0 +1,91 @@
+"""html_export.py
+Bulk-friendly HTML export for Plotly figures.
+
+fig.write_html() inlines the full plotly.js bundle (several MB) into every file.
+write_shared_html() instead writes the bundle once into a shared, local asset
+directory and emits small HTML files that reference it by relative path, so the
+pages also work offline (no CDN). Figure JSON can be minified and each page can
+get a pre-compressed .html.gz sibling for static servers that serve those directly.
+
+Usage:
+    from html_export import write_shared_html
+    write_shared_html(fig, 'charts/akkar.html', asset_dir='charts/assets', gzip_copy=True)
+"""
+import gzip
+import json
+import os
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+from atomic_file import atomic_write
+
+
+def _write_atomic(path, data):
+    with atomic_write(path) as f:
+        f.write(data)
+
+
+def _write_gzip(path, data):
+    # mtime=0 keeps the .gz byte-identical across re-exports of the same page
+    _write_atomic(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def ensure_plotlyjs(asset_dir, gzip_copy=False):
+    """Write the bundled plotly.js into asset_dir once; returns its path.
+
+    The file name carries the plotly.js version, so upgrading plotly adds a new
+    bundle rather than silently changing the one older pages point to.
+    """
+    os.makedirs(asset_dir, exist_ok=True)
+    path = os.path.join(asset_dir, f'plotly-{get_plotlyjs_version()}.min.js')
+    if not os.path.exists(path):
+        _write_atomic(path, get_plotlyjs().encode('utf-8'))
+    if gzip_copy and not os.path.exists(path + '.gz'):
+        with open(path, 'rb') as f:
+            _write_gzip(path, f.read())
+    return path
+
+
+def _round_floats(obj, digits):
+    if isinstance(obj, float):
+        return round(obj, digits)
+    if isinstance(obj, dict):
+        return {k: _round_floats(v, digits) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_round_floats(v, digits) for v in obj]
+    return obj
+
+
+def minify_figure(fig, float_digits=6):
+    """Figure dict with template trace defaults pruned to the trace types in use.
+
+    A template carries default styling for every trace type (scatter, heatmap,
+    surface, ...); only the types actually plotted affect the page. Floats are
+    rounded to float_digits decimals, which removes noise such as 945.0000000000001.
+    """
+    fig_dict = json.loads(pio.to_json(fig, validate=False))
+    used = {trace.get('type', 'scatter') for trace in fig_dict.get('data', [])}
+    template = fig_dict.get('layout', {}).get('template')
+    if template and 'data' in template:
+        template['data'] = {k: v for k, v in template['data'].items() if k in used}
+    return _round_floats(fig_dict, float_digits) if float_digits is not None else fig_dict
+
+
+def write_shared_html(fig, out_path, asset_dir, minify=True, gzip_copy=False):
+    """Write fig as HTML that loads plotly.js from asset_dir instead of inlining it.
+
+    Returns the number of bytes written (uncompressed).
+    """
+    js_path = ensure_plotlyjs(asset_dir, gzip_copy=gzip_copy)
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(out_dir, exist_ok=True)
+    src = os.path.relpath(os.path.abspath(js_path), out_dir).replace(os.sep, '/')
+
+    figure = minify_figure(fig) if minify else fig
+    html = pio.to_html(figure, include_plotlyjs=src, full_html=True, validate=not minify)
+    data = html.encode('utf-8')
+    _write_atomic(out_path, data)
+    if gzip_copy:
+        _write_gzip(out_path, data)
+    return len(data)
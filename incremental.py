@@ -0,0 +1,159 @@
+"""incremental.py
+Keep the governorate aggregate current as observations are appended to the CSV.
+
+The source system only appends rows, each identified by its Observation URI.
+IncrementalAggregator remembers how far into the file it has read (a byte-offset
+watermark) and each URI's last contribution, so update() parses only the bytes
+appended since the previous call. A row whose URI was already seen is treated as
+a correction: the old contribution is subtracted before the new one is added.
+Update cost is proportional to the appended delta, not to the file's history.
+
+If the file shrinks or is replaced (different inode), the state is rebuilt from
+scratch. Rows are split on newlines, so quoted fields must not contain line breaks.
+
+Usage:
+    agg_state = IncrementalAggregator(csv_path)
+    agg_state.update()            # first call reads the whole file
+    ...                           # rows appended upstream
+    agg_state.update()            # folds in only the new rows
+    agg = agg_state.aggregate()   # same table as load_and_prepare()
+    agg_state.save('state.json'); IncrementalAggregator.load('state.json')
+"""
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from atomic_file import atomic_write
+from visualization_clean import AGGREGATE_DTYPES, FACILITY_TOTALS, finish_aggregate, prepare_town_table
+
+
+URI_COLUMN = 'Observation URI'
+
+_STATE_VERSION = 1
+
+
+class IncrementalAggregator:
+    """Per-governorate facility sums maintained from an append-only CSV."""
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0            # bytes of the file already folded in (always at a line end)
+        self.file_id = None        # [st_dev, st_ino] of the file the offset refers to
+        self.header = b''
+        self.rows = {}             # Observation URI -> [governorate, hotels, restaurants, cafes, guest houses]
+        self.sums = {}             # governorate -> np.array([hotels, restaurants, cafes, guest houses, rows])
+        self.rows_seen = 0
+
+    def _read_delta(self):
+        """Complete lines appended since the watermark (a trailing partial line waits for next time)."""
+        st = os.stat(self.csv_path)
+        file_id = [st.st_dev, st.st_ino]
+        if self.file_id is not None and (file_id != self.file_id or st.st_size < self.offset):
+            self._reset()  # truncated or replaced: the watermark no longer means anything
+        self.file_id = file_id
+
+        with open(self.csv_path, 'rb') as f:
+            if self.offset == 0:
+                self.header = f.readline()
+                self.offset = len(self.header)
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+
+        end = data.rfind(b'\n') + 1
+        return data[:end]
+
+    def _fold(self, town):
+        """Subtract superseded contributions and add the new ones."""
+        n_totals = len(FACILITY_TOTALS)
+        uris = town[URI_COLUMN].to_numpy(dtype=object)
+        govs = town['Governorate'].to_numpy(dtype=object)
+        counts = town[FACILITY_TOTALS].to_numpy(dtype=np.int64)
+
+        for uri, gov, row in zip(uris, govs, counts):
+            if pd.isna(uri):
+                uri = f'@row{self.rows_seen}'  # no URI: every such row is a distinct observation
+            self.rows_seen += 1
+
+            old = self.rows.get(uri)
+            if old is not None:
+                old_sums = self.sums[old[0]]
+                old_sums[:n_totals] -= old[1:]
+                old_sums[n_totals] -= 1
+                if old_sums[n_totals] == 0:
+                    del self.sums[old[0]]
+
+            if pd.isna(gov):
+                self.rows.pop(uri, None)  # groupby(dropna=True) ignores rows without a governorate
+                continue
+            new_sums = self.sums.setdefault(gov, np.zeros(n_totals + 1, dtype=np.int64))
+            new_sums[:n_totals] += row
+            new_sums[n_totals] += 1
+            self.rows[uri] = [gov, *row.tolist()]
+
+    def update(self):
+        """Fold in rows appended since the last call. Returns the number of rows parsed."""
+        delta = self._read_delta()
+        if not delta:
+            return 0
+
+        wanted = set(AGGREGATE_DTYPES) | {URI_COLUMN}
+        try:
+            df = pd.read_csv(io.BytesIO(self.header + delta), usecols=lambda c: c in wanted,
+                             dtype=AGGREGATE_DTYPES)
+        except (ValueError, TypeError):
+            # A count column holds non-numeric text: parse it untyped and let
+            # prepare_town_table's to_numeric(errors='coerce') clean it up, as read_tourism_csv does
+            df = pd.read_csv(io.BytesIO(self.header + delta), usecols=lambda c: c in wanted)
+        if URI_COLUMN not in df.columns:
+            df[URI_COLUMN] = np.nan
+        self._fold(prepare_town_table(df))
+        self.offset += len(delta)
+        return len(df)
+
+    def aggregate(self):
+        """Current aggregate, in the same shape and order as load_and_prepare()."""
+        index = pd.Index(list(self.sums), name='Governorate')
+        values = np.array([v[:len(FACILITY_TOTALS)] for v in self.sums.values()], dtype=np.int64)
+        sums = pd.DataFrame(values.reshape(len(index), len(FACILITY_TOTALS)), index=index, columns=FACILITY_TOTALS)
+        return finish_aggregate(sums)
+
+    def save(self, path):
+        """Persist the watermark and per-URI contributions as JSON."""
+        state = {
+            'version': _STATE_VERSION,
+            'csv_path': self.csv_path,
+            'offset': self.offset,
+            'file_id': self.file_id,
+            'header': self.header.decode('utf-8'),
+            'rows_seen': self.rows_seen,
+            'rows': self.rows,
+        }
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path):
+        """Restore a saved state; the per-governorate sums are rebuilt from the rows."""
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != _STATE_VERSION:
+            raise ValueError(f"unsupported incremental state version {state.get('version')!r}")
+
+        restored = cls(state['csv_path'])
+        restored.offset = state['offset']
+        restored.file_id = state['file_id']
+        restored.header = state['header'].encode('utf-8')
+        restored.rows_seen = state['rows_seen']
+        restored.rows = state['rows']
+        n_totals = len(FACILITY_TOTALS)
+        for gov, *row in restored.rows.values():
+            sums = restored.sums.setdefault(gov, np.zeros(n_totals + 1, dtype=np.int64))
+            sums[:n_totals] += row
+            sums[n_totals] += 1
+        return restored
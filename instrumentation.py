@@ -0,0 +1,175 @@
+"""instrumentation.py
+Opt-in per-stage timing and memory instrumentation for the chart pipeline.
+
+Wrap a stage in `with stage('parse_csv') as s: ...; s.rows = len(df)`. When
+instrumentation is off (the default) stage() returns one shared no-op context
+manager, so instrumented code pays a function call and nothing else. When it is
+on, each stage emits one JSON line with its wall time, rows processed and the
+peak traced memory while it ran (tracemalloc), e.g.
+
+    {"stage": "parse_csv", "wall_s": 0.0123, "rows": 1137, "peak_mb": 1.9, "alloc_mb": 0.8, ...}
+
+Enable with the environment variable TOURISM_PROFILE=1 (lines go to stderr, or
+appended to the file named by TOURISM_PROFILE_FILE), with `--profile` on the
+visualization_clean.py command line, or by calling enable(). The most recent
+records are kept in memory for display, see records().
+
+tracemalloc measures the whole process, so peak_mb is the process-wide peak while
+the stage was open: when stages run concurrently on several threads (Streamlit
+sessions, snapshots.load_snapshots) it includes what the other threads allocated
+in the meantime, and alloc_mb is an upper bound for the stage's own allocations.
+"""
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+
+ENABLED = os.environ.get('TOURISM_PROFILE', '').strip().lower() not in ('', '0', 'false', 'no')
+
+_output = os.environ.get('TOURISM_PROFILE_FILE') or None
+_records = collections.deque(maxlen=1000)
+_local = threading.local()  # per-thread stack of open stages (for depth)
+_open = set()               # open stages of every thread; guarded by _peak_lock
+_peak_lock = threading.Lock()
+_lock = threading.Lock()
+_started_tracing = False
+
+
+class _NullStage:
+    """Shared do-nothing stage used while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def rows(self):
+        return None
+
+    @rows.setter
+    def rows(self, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'rows', 'extra', 'start', 'start_mem', 'peak')
+
+    def __init__(self, name, rows, extra):
+        self.name = name
+        self.rows = rows
+        self.extra = extra
+
+    def __enter__(self):
+        _stack().append(self)
+        with _peak_lock:
+            # reset_peak() is process-wide: first credit the peak so far to every open
+            # stage, in any thread, so no enclosing or concurrent stage loses it
+            _record_peak()
+            self.start_mem = tracemalloc.get_traced_memory()[0]
+            self.peak = self.start_mem
+            _open.add(self)
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start
+        with _peak_lock:
+            _record_peak()  # every open stage was already open at the last reset
+            _open.discard(self)
+        stack = _stack()
+        stack.pop()
+
+        record = {
+            'stage': self.name,
+            'wall_s': round(wall, 6),
+            'rows': self.rows,
+            'peak_mb': round(self.peak / 1e6, 3),
+            'alloc_mb': round((self.peak - self.start_mem) / 1e6, 3),
+            'depth': len(stack),
+            'pid': os.getpid(),
+            'ts': round(time.time(), 3),
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        if self.extra:
+            record.update(self.extra)
+        _emit(record)
+        return False
+
+
+def _record_peak():
+    """Fold the traced peak since the last reset into every open stage (caller holds _peak_lock)."""
+    peak = tracemalloc.get_traced_memory()[1]
+    for open_stage in _open:
+        open_stage.peak = max(open_stage.peak, peak)
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _emit(record):
+    line = json.dumps(record, default=str)
+    with _lock:
+        _records.append(record)
+        if _output is None:
+            print(line, file=sys.stderr)
+        else:
+            with open(_output, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+def stage(name, rows=None, **extra):
+    """Context manager timing one pipeline stage (a no-op unless instrumentation is enabled)."""
+    if not ENABLED:
+        return _NULL_STAGE
+    return _Stage(name, rows, extra)
+
+
+def enable(output=None):
+    """Turn instrumentation on; `output` is a JSON-lines file path (default: stderr)."""
+    global ENABLED, _output, _started_tracing
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    if output is not None:
+        _output = output
+    ENABLED = True
+
+
+def disable():
+    """Turn instrumentation off; stops tracemalloc only if enable() started it."""
+    global ENABLED, _started_tracing
+    ENABLED = False
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+def records():
+    """The most recent stage records (oldest first), as dicts."""
+    with _lock:
+        return list(_records)
+
+
+def clear():
+    with _lock:
+        _records.clear()
+
+
+if ENABLED:
+    enable()
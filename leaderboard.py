@@ -0,0 +1,107 @@
+"""leaderboard.py
+Top-K towns per governorate by any numeric column (Tourism Index, facility totals, ...).
+
+TownLeaderboard sorts the town table by governorate once and remembers each
+governorate's row range (group offsets). A query then only runs a partial
+selection (np.partition) inside each range to find its K best towns and sorts
+those K, so "top 10 towns in every governorate" is one call that touches each
+row once, with no per-query full sort.
+
+Usage:
+    board = load_leaderboard()
+    board.top(10)                                   # by Total Facilities, every governorate
+    board.top(5, by='Tourism Index', governorates=['Matn', 'Chouf'])
+    make_leaderboard_chart(board.top(5))            # small multiples, see visualization_clean
+"""
+import numpy as np
+import pandas as pd
+
+from town_snapshot import build_town_table, shared_town_table
+from visualization_clean import DEFAULT_CSV, FACILITY_TOTALS
+
+
+TOURISM_INDEX = 'Tourism Index'
+
+
+class TownLeaderboard:
+    """Town rows grouped by governorate with precomputed offsets for per-group top-K queries."""
+
+    def __init__(self, town):
+        town = town[town['Governorate'].notna()]
+        governorate = town['Governorate'].astype('category')
+        order = np.argsort(governorate.cat.codes.to_numpy(), kind='stable')
+        codes = governorate.cat.codes.to_numpy()[order]
+
+        self.governorates = [str(g) for g in governorate.cat.categories]
+        starts = np.searchsorted(codes, np.arange(len(self.governorates)), side='left')
+        stops = np.searchsorted(codes, np.arange(len(self.governorates)), side='right')
+        self._offsets = {g: (a, b) for g, a, b in zip(self.governorates, starts, stops)}
+
+        self._towns = town['Town'].astype(str).str.strip().to_numpy(dtype=object)[order]
+        self._columns = {
+            col: town[col].to_numpy()[order]
+            for col in town.columns
+            if col not in ('Town', 'Governorate', 'refArea') and pd.api.types.is_numeric_dtype(town[col])
+        }
+
+    @property
+    def metrics(self):
+        """Columns that can be ranked by."""
+        return list(self._columns)
+
+    def top(self, k=10, by='Total Facilities', governorates=None):
+        """The k best towns by `by` in each governorate, as one long table.
+
+        Columns: Governorate, Rank (1 = best), Town and every metric. Towns with a
+        missing `by` value are not ranked; ties keep file order. governorates=None
+        means all of them, in alphabetical order.
+        """
+        if by not in self._columns:
+            raise ValueError(f'by must be one of {self.metrics}, got {by!r}')
+        values = self._columns[by]
+
+        picked, groups, ranks = [], [], []
+        for gov in self.governorates if governorates is None else governorates:
+            start, stop = self._offsets.get(gov, (0, 0))
+            rows = np.arange(start, stop)
+            vals = values[start:stop]
+            if vals.dtype.kind == 'f':
+                keep = ~np.isnan(vals)
+                rows, vals = rows[keep], vals[keep]
+            if len(rows) > k:
+                # k-th best value by partial selection; ties at that value are filled in file order.
+                # Values are never negated: counts may be unsigned (compact_table)
+                kth = np.partition(vals, len(vals) - k)[len(vals) - k]
+                above = np.flatnonzero(vals > kth)
+                at = np.flatnonzero(vals == kth)[:k - len(above)]
+                part = np.concatenate([above, at])
+                rows, vals = rows[part], vals[part]
+            rank = np.unique(vals, return_inverse=True)[1].reshape(-1)  # dense rank, signed for any dtype
+            best = rows[np.lexsort((rows, -rank))]
+            picked.append(best)
+            groups.extend([gov] * len(best))
+            ranks.append(np.arange(1, len(best) + 1))
+
+        rows = np.concatenate(picked) if picked else np.array([], dtype=int)
+        board = pd.DataFrame({
+            'Governorate': groups,
+            'Rank': np.concatenate(ranks) if ranks else np.array([], dtype=int),
+            'Town': self._towns[rows],
+        })
+        for col, vals in self._columns.items():
+            board[col] = vals[rows]
+        return board
+
+
+def load_leaderboard(csv_path=DEFAULT_CSV, snapshot_path=None):
+    """Leaderboard over a CSV's towns, with Tourism Index and per-town Total Facilities.
+
+    With snapshot_path the town table is memory-mapped from a town_snapshot file
+    (exported first if missing or stale) instead of parsed from the CSV.
+    """
+    if snapshot_path is not None:
+        town = shared_town_table(csv_path, snapshot_path).copy(deep=False)
+    else:
+        town = build_town_table(csv_path)
+    town['Total Facilities'] = town[FACILITY_TOTALS].sum(axis=1)
+    return TownLeaderboard(town)
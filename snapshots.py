@@ -0,0 +1,110 @@
+"""snapshots.py
+Load a directory of dated CSV snapshots concurrently into one time series.
+
+Each file under data/ is a snapshot whose name ends in its export timestamp
+(..._20240902_115953.csv). load_snapshots() aggregates every snapshot with
+load_and_prepare() on a thread pool (the pyarrow CSV parser and the groupby
+release the GIL), so loading N files takes about as long as the slowest one
+rather than N times as long. The results are aligned on Governorate and
+returned in long format, one row per (Snapshot, Governorate), ready for
+visualization_clean.make_trend_chart().
+
+Run: python snapshots.py data/ [-o trends.html] [--workers 8]
+"""
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import tourism_cache
+from visualization_clean import FACILITY_TOTALS, load_and_prepare, make_trend_chart
+
+
+_TIMESTAMP = re.compile(r'(\d{8})_(\d{6})(?=\.csv$)')
+
+SERIES_COLUMNS = ['Snapshot', 'Governorate'] + FACILITY_TOTALS + ['Total Facilities']
+
+
+def snapshot_time(csv_path):
+    """Timestamp of a snapshot: from the file name when it carries one, else its mtime."""
+    match = _TIMESTAMP.search(os.path.basename(csv_path))
+    if match:
+        return pd.Timestamp(datetime.strptime(''.join(match.groups()), '%Y%m%d%H%M%S'))
+    return pd.Timestamp(os.path.getmtime(csv_path), unit='s').floor('s')
+
+
+def snapshot_paths(source):
+    """CSV paths for a directory, a glob pattern or a list of paths, oldest snapshot first."""
+    if isinstance(source, (list, tuple)):
+        paths = list(source)
+    elif os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '*.csv'))
+    else:
+        paths = glob.glob(source)
+    return sorted(paths, key=lambda p: (snapshot_time(p), p))
+
+
+def _load_one(csv_path, cache_dir):
+    start = time.perf_counter()
+    agg = load_and_prepare(csv_path, cache_dir=cache_dir)
+    return agg, time.perf_counter() - start
+
+
+def load_snapshots(source='data', workers=None, cache_dir=None, timings=None):
+    """Long-format facility totals for every snapshot in `source`.
+
+    Snapshots are loaded concurrently (workers=None: one thread per file, at most
+    32). Every snapshot is aligned on the union of governorates, so a governorate
+    missing from one snapshot appears there with zero facilities. If `timings` is
+    a dict it receives per-file seconds ({path: s}) plus 'wall_s', the elapsed
+    time of the whole load.
+    """
+    paths = snapshot_paths(source)
+    if not paths:
+        raise FileNotFoundError(f'no CSV snapshots found in {source!r}')
+
+    start = time.perf_counter()
+    workers = workers or min(32, len(paths))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='snapshot') as pool:
+        results = list(pool.map(_load_one, paths, [cache_dir] * len(paths)))
+
+    governorates = sorted(set().union(*(agg['Governorate'] for agg, _ in results)))
+    frames = []
+    for path, (agg, _) in zip(paths, results):
+        frame = agg.set_index('Governorate').reindex(governorates, fill_value=0).reset_index()
+        frame.insert(0, 'Snapshot', snapshot_time(path))
+        frames.append(frame)
+    series = pd.concat(frames, ignore_index=True)[SERIES_COLUMNS]
+
+    if timings is not None:
+        timings.update({path: seconds for path, (_, seconds) in zip(paths, results)})
+        timings['wall_s'] = time.perf_counter() - start
+    return series
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Plot facility totals across dated CSV snapshots.')
+    parser.add_argument('source', nargs='?', default='data', help='directory or glob of snapshot CSVs')
+    parser.add_argument('-o', '--out', default='trends.html')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default=None,
+                        help=f'reuse cached aggregates (e.g. {tourism_cache.DEFAULT_CACHE_DIR})')
+    args = parser.parse_args(argv)
+
+    timings = {}
+    series = load_snapshots(args.source, workers=args.workers, cache_dir=args.cache_dir, timings=timings)
+    wall = timings.pop('wall_s')
+    print(f"✓ {len(timings)} snapshot(s), {series['Governorate'].nunique()} governorates in {wall:.2f} s "
+          f"(slowest file {max(timings.values()):.2f} s, sum of files {sum(timings.values()):.2f} s)")
+
+    make_trend_chart(series).write_html(args.out)
+    print(f"✓ Output written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""standalone_page.py
+Generate visualization_standalone.html straight from the Python pipeline.
+
+The page is built from load_and_prepare() and make_clean_bar(), so its numbers,
+names and annotation text are exactly what the Python chart shows. The figure's
+layout and trace styling are embedded once (minified, see html_export), and the
+per-category data travels as compact columns:
+- names: one newline-joined string (no per-row quotes or keys)
+- values: a base64 little-endian typed array, using the narrowest unsigned
+  integer type that fits (Uint8Array / Uint16Array / Uint32Array)
+- colors: only the highlighted rows, as [index, color] pairs over a base color
+
+Run: python standalone_page.py [CSV] [-o visualization_standalone.html] [--plotlyjs-dir assets]
+"""
+import argparse
+import base64
+import html
+import json
+import os
+
+import numpy as np
+
+from plotly.offline import get_plotlyjs_version
+
+from compact_table import smallest_unsigned
+from html_export import ensure_plotlyjs, minify_figure
+from visualization_clean import DEFAULT_CSV, load_and_prepare, make_clean_bar
+
+
+# Same plotly.js version the figure JSON was generated for (what plotly.py's own 'cdn' mode uses)
+CDN_PLOTLYJS = f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'
+
+_TYPED_ARRAYS = {np.dtype(np.uint8): 'Uint8Array', np.dtype(np.uint16): 'Uint16Array', np.dtype(np.uint32): 'Uint32Array'}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Lebanon Tourism Infrastructure Analysis - Data Visualization</title>
+    <meta name="description" content="{description}">
+    <meta name="author" content="MSBA 325 Assignment 3">
+
+    <!-- Generated by standalone_page.py from {source}; do not edit by hand -->
+    <script src="{plotlyjs}" charset="utf-8"></script>
+
+    <style>
+        body {{
+            margin: 0;
+            padding: 0;
+            background-color: white;
+            overflow: hidden;
+        }}
+
+        #visualization {{
+            width: 100vw;
+            height: 100vh;
+        }}
+    </style>
+</head>
+<body>
+    <div id="visualization"></div>
+
+    <script>
+        // Column-oriented data payload plus the figure's layout and trace styling
+        const payload = {payload};
+
+        function decodeTyped(b64, TypedArray) {{
+            const bin = atob(b64);
+            const bytes = new Uint8Array(bin.length);
+            for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+            return Array.from(new TypedArray(bytes.buffer));
+        }}
+
+        const names = payload.names === '' ? [] : payload.names.split('\\n');
+        const values = decodeTyped(payload.values, window[payload.valuesType]);
+        const colors = names.map(() => payload.baseColor);
+        payload.highlights.forEach(([idx, color]) => {{ colors[idx] = color; }});
+
+        const trace = Object.assign(payload.trace, {{
+            x: names,
+            y: values,
+            text: values,
+            customdata: names
+        }});
+        trace.marker = Object.assign(trace.marker || {{}}, {{ color: colors }});
+
+        // Create the plot - hide all controls
+        Plotly.newPlot('visualization', [trace], payload.layout, {{
+            responsive: true,
+            displayModeBar: false,
+            displaylogo: false
+        }});
+    </script>
+</body>
+</html>
+"""
+
+
+def encode_typed_array(values):
+    """(base64, JS typed-array name) for non-negative integers, narrowest type that fits."""
+    narrow = smallest_unsigned(np.asarray(values, dtype=np.int64), dtypes=list(_TYPED_ARRAYS))
+    data = narrow.astype(narrow.dtype.newbyteorder('<')).tobytes()
+    return base64.b64encode(data).decode('ascii'), _TYPED_ARRAYS[narrow.dtype]
+
+
+def build_payload(agg, summary):
+    """Compact JSON-able payload for the page: data columns + minified figure layout/styling."""
+    names = agg['Governorate'].astype(str).tolist()
+    if any('\n' in n for n in names):
+        raise ValueError('category names must not contain newlines')
+    values_b64, values_type = encode_typed_array(agg['Total Facilities'].to_numpy())
+
+    # Every row is shipped, so the layout (axis range, ticks) must be for every row
+    # too, not for make_clean_bar's default top-MAX_BARS + "Other" view
+    fig = minify_figure(make_clean_bar(agg, summary=summary, max_bars=None))
+    trace = fig['data'][0]
+    if len(trace.get('x', [])) != len(names):
+        raise ValueError(f"figure has {len(trace.get('x', []))} bars for {len(names)} categories")
+    for key in ('x', 'y', 'text', 'customdata'):
+        trace.pop(key, None)
+    colors = trace.get('marker', {}).pop('color', [])
+    base_color = max(set(colors), key=colors.count) if colors else '#D3D3D3'
+
+    return {
+        'names': '\n'.join(names),
+        'values': values_b64,
+        'valuesType': values_type,
+        'baseColor': base_color,
+        'highlights': [[i, c] for i, c in enumerate(colors) if c != base_color],
+        'trace': trace,
+        'layout': fig['layout'],
+    }
+
+
+def render_page(agg, summary, source='sample data', plotlyjs=CDN_PLOTLYJS):
+    """Full HTML text of the standalone page."""
+    payload = json.dumps(build_payload(agg, summary), separators=(',', ':'), ensure_ascii=False)
+    payload = payload.replace('<', '\\u003c')  # never close the <script> early
+    description = (
+        f"Interactive visualization showing tourism infrastructure concentration in Lebanon, with "
+        f"{' and '.join(summary['top_names'])} accounting for {summary['top_share']:.0%} of all facilities."
+    )
+    return PAGE_TEMPLATE.format(
+        description=html.escape(description),
+        source=html.escape(source),
+        plotlyjs=html.escape(plotlyjs),
+        payload=payload,
+    )
+
+
+def write_standalone_page(csv_path=DEFAULT_CSV, out_path='visualization_standalone.html', plotlyjs_dir=None):
+    """Regenerate the standalone page. Returns the number of bytes written.
+
+    plotlyjs_dir=None references the public CDN; a directory path writes plotly.js
+    there once (html_export.ensure_plotlyjs) and references it relatively, for offline use.
+    """
+    agg, summary = load_and_prepare(csv_path, with_summary=True)
+    plotlyjs = CDN_PLOTLYJS
+    if plotlyjs_dir:
+        js_path = ensure_plotlyjs(plotlyjs_dir)
+        plotlyjs = os.path.relpath(js_path, os.path.dirname(os.path.abspath(out_path))).replace(os.sep, '/')
+
+    page = render_page(agg, summary, source=os.path.basename(csv_path), plotlyjs=plotlyjs)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return len(page.encode('utf-8'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the standalone HTML chart from the pipeline.')
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('-o', '--out', default='visualization_standalone.html')
+    parser.add_argument('--plotlyjs-dir', default=None,
+                        help='write plotly.js here and reference it locally instead of the CDN')
+    args = parser.parse_args(argv)
+
+    size = write_standalone_page(args.csv, args.out, args.plotlyjs_dir)
+    print(f"✓ {args.out} written ({size:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""tourism_cache.py
+On-disk cache for the cleaned town-level table and the governorate aggregate.
+
+Each entry is one NumPy .npz archive named after a fingerprint of the source CSV
+(absolute path, size, mtime and a BLAKE2 hash of its bytes). A worker that starts
+against an unchanged file loads two small binary tables instead of re-parsing the
+CSV and re-running the refArea cleanup and groupby.
+
+Usage:
+    town, agg = load_cached_tables(csv_path, build, cache_dir='.tourism_cache')
+    clear_cache('.tourism_cache')
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from atomic_file import atomic_write
+
+
+DEFAULT_CACHE_DIR = '.tourism_cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bump when the cleaning or aggregation logic changes so old entries stop matching
+# (2: Governorate names are repaired when their UTF-8 was decoded as Latin-1)
+CACHE_VERSION = 2
+
+_HASH_CHUNK = 1 << 20
+
+
+def file_fingerprint(path, content_hash=True):
+    """Hex digest identifying one version of a file.
+
+    Combines the absolute path, size and mtime; with content_hash=True the file's
+    bytes are hashed too, so a rewrite that keeps size and mtime is still detected.
+    """
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|v{CACHE_VERSION}'.encode())
+    if content_hash:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _frame_arrays(prefix, df):
+    """Flatten a DataFrame into npz-safe arrays plus a JSON-able column spec.
+
+    Text and categorical columns are dictionary-encoded (int32 codes, -1 for
+    missing, plus the unique values) so repeated URIs are stored once.
+    """
+    arrays, spec = {}, []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        key = f'{prefix}{i}'
+        if pd.api.types.is_numeric_dtype(s) and not isinstance(s.dtype, pd.CategoricalDtype):
+            arrays[key] = s.to_numpy()
+            kind = 'num'
+        else:
+            codes, uniques = pd.factorize(s)
+            arrays[key] = codes.astype(np.int32)
+            arrays[key + 'u'] = np.array([str(u) for u in uniques], dtype=str)
+            kind = 'category' if isinstance(s.dtype, pd.CategoricalDtype) else 'str'
+        spec.append([str(col), key, kind])
+    return arrays, spec
+
+
+def _arrays_frame(npz, spec):
+    data = {}
+    for col, key, kind in spec:
+        if kind == 'num':
+            data[col] = npz[key]
+            continue
+        codes, uniques = npz[key], npz[key + 'u'].astype(object)
+        if kind == 'category':
+            data[col] = pd.Categorical.from_codes(codes, categories=uniques)
+        else:
+            values = uniques.take(codes, mode='clip') if len(uniques) else np.full(len(codes), np.nan, dtype=object)
+            values[codes < 0] = np.nan
+            data[col] = values
+    return pd.DataFrame(data)
+
+
+def _write_entry(path, town, agg):
+    town_arrays, town_spec = _frame_arrays('t', town)
+    agg_arrays, agg_spec = _frame_arrays('a', agg)
+    meta = json.dumps({'version': CACHE_VERSION, 'town': town_spec, 'agg': agg_spec})
+    # Atomic with a unique temp name, so concurrent workers (processes or threads)
+    # rebuilding the same entry never see or clobber a half-written one
+    with atomic_write(path) as f:
+        np.savez(f, meta=np.array(meta), **town_arrays, **agg_arrays)
+
+
+def _read_entry(path):
+    with np.load(path, allow_pickle=False) as npz:
+        meta = json.loads(str(npz['meta']))
+        return _arrays_frame(npz, meta['town']), _arrays_frame(npz, meta['agg'])
+
+
+def evict(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, keep=None):
+    """Delete least recently used entries until the directory holds at most max_bytes.
+
+    Entries are touched on every hit, so mtime order is LRU order. `keep` is never evicted.
+    Returns the number of entries removed.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.npz'):
+            path = os.path.join(cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """Remove every cache entry. Returns the number of entries removed."""
+    if not os.path.isdir(cache_dir):
+        return 0
+    return evict(cache_dir, max_bytes=-1)
+
+
+def load_cached_tables(csv_path, build, cache_dir=DEFAULT_CACHE_DIR, refresh=False,
+                       max_bytes=DEFAULT_MAX_BYTES):
+    """Return build(csv_path) -> (town_table, aggregate), from cache while the CSV is unchanged.
+
+    refresh=True ignores any existing entry and rebuilds it. After a rebuild the
+    directory is trimmed to max_bytes (least recently used entries first).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, file_fingerprint(csv_path) + '.npz')
+
+    if not refresh and os.path.exists(path):
+        try:
+            tables = _read_entry(path)
+        except Exception:
+            # Corrupt (a truncated archive raises BadZipFile, EOFError, zlib.error, ...)
+            # or from an incompatible version: drop it and rebuild below
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        else:
+            os.utime(path)
+            return tables
+
+    town, agg = build(csv_path)
+    _write_entry(path, town, agg)
+    evict(cache_dir, max_bytes, keep=path)
+    return town, agg
@@ -0,0 +1,255 @@
+"""town_match.py
+Town-name normalization and indexed fuzzy matching, for joining towns across snapshots.
+
+Town names are not consistent: stray spaces (" Bireh", "Jounie "), URL-encoded
+forms in Observation URI (...Tourism-A%27ain+El-Mir+%28El+Establ%29) and
+transliteration variants (Chouf / Shouf, Qornet / Kornet, Aabadiyeh / Abadiye).
+match_key() folds a name to a spelling-insensitive key, and TownIndex keeps an
+inverted index from character trigrams of those keys to canonical towns. A lookup
+only visits the posting lists of the query's own trigrams, so its cost depends on
+the query rather than on the number of towns (no pairwise comparison). The few
+candidates sharing the most trigrams (Dice coefficient) are then scored by the
+edit similarity of the two keys (difflib ratio, 1.0 = same key), which tells
+one-letter typos from different towns far better than trigram overlap alone.
+
+TownIndex is also the canonical-ID mapping: every distinct canonical name has an
+integer ID, resolve() returns the ID of the best match or registers the name as
+a new town, and answers are cached per raw name. IDs identify names, so
+homonymous towns in different districts share one.
+
+Usage:
+    index = load_town_index()                       # canonical towns of one CSV
+    index.lookup('Shebaa')                          # [(id, 'Chebaa', 1.0), (id, 'shebaneye', 0.8), ...]
+    index.match('http://.../Tourism-+Bireh')        # (id, 1.0)
+    align_snapshots('data/')                        # Town ID for every town of every snapshot
+
+Run: python town_match.py [NAME ...] [--csv CSV] [--align data/]
+"""
+import argparse
+import re
+import time
+import unicodedata
+from difflib import SequenceMatcher
+from urllib.parse import unquote_plus
+
+import pandas as pd
+
+from snapshots import snapshot_paths, snapshot_time
+from visualization_clean import DEFAULT_CSV, read_tourism_csv
+
+
+NGRAM = 3
+CANDIDATES = 10          # trigram candidates re-scored by edit similarity per lookup
+DEFAULT_MIN_SCORE = 0.85
+
+_URI_TOWN = re.compile(r'/observation/Tourism-([^/?#]*)$')
+_ALTERNATE = re.compile(r'\(([^)]*)\)')   # "Aanjar (Haouch Moussa)": the parenthesised alternate name
+
+# Spelling folds applied in order to the lowercased ASCII name. They merge the
+# usual French/English transliteration variants of Arabic place names.
+_FOLDS = [
+    (re.compile(r"['`‘’ʼʻ]"), ''),           # A'ain -> Aain
+    (re.compile(r'[^a-z0-9]+'), ' '),                             # punctuation, hyphens
+    (re.compile(r'\b(?:el|al|ech|esh|ed|ej|er|es|et|ez|en)\b'), ' '), # articles: Marj Ez-Zouhour
+    (re.compile(r'ou'), 'u'),                                     # Zouhour -> Zuhur
+    (re.compile(r'ch'), 'sh'),                                    # Chouf -> Shouf
+    (re.compile(r'q'), 'k'),                                      # Qornet -> Kornet
+    (re.compile(r'ee'), 'i'),
+    (re.compile(r'y'), 'i'),
+    (re.compile(r'(?<=[a-z])(?:eh|ah|e|a)\b'), 'e'),              # Aabadiyeh / -iye / -iya
+    (re.compile(r'([a-z])\1+'), r'\1'),                           # doubled letters: Aabba -> Aba
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_town(name):
+    """Display form of a town name: decoded from an Observation URI if it is one,
+    whitespace trimmed and collapsed. None/NaN gives ''."""
+    if name is None or name != name:
+        return ''
+    name = str(name)
+    match = _URI_TOWN.search(name)
+    if match or '%' in name:
+        name = unquote_plus(match.group(1) if match else name)
+    return ' '.join(name.split())
+
+
+def match_key(name):
+    """Spelling-insensitive key: normalized, accents stripped, lowercased and folded with _FOLDS."""
+    text = unicodedata.normalize('NFKD', normalize_town(name))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    for pattern, replacement in _FOLDS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def town_ngrams(key, n=NGRAM):
+    """Set of character n-grams of a match key, padded so word boundaries count."""
+    padded = f' {key} '
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class TownIndex:
+    """Canonical towns with a trigram inverted index and a cached name -> ID mapping."""
+
+    def __init__(self, names=(), n=NGRAM):
+        self.n = n
+        self.names = []          # canonical display name per ID
+        self._match_keys = []    # match key per ID
+        self._exact = {}         # casefolded display name -> ID
+        self._keys = {}          # match key (or alternate-name key) -> first ID with that key
+        self._gram_counts = []   # number of distinct n-grams per ID
+        self._postings = {}      # n-gram -> list of IDs containing it
+        self._cache = {}         # (raw name, min_score) -> (ID, score)
+        for name in names:
+            display = normalize_town(name)
+            if display and display.casefold() not in self._exact:
+                self._add(display)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add(self, display):
+        town_id = len(self.names)
+        key = match_key(display)
+        grams = town_ngrams(key, self.n)
+        self.names.append(display)
+        self._match_keys.append(key)
+        self._exact[display.casefold()] = town_id
+        self._keys.setdefault(key, town_id)
+        for alias in [_ALTERNATE.sub(' ', display), *_ALTERNATE.findall(display)]:
+            if match_key(alias):
+                self._keys.setdefault(match_key(alias), town_id)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(town_id)
+        return town_id
+
+    def _exact_id(self, name, key):
+        town_id = self._exact.get(normalize_town(name).casefold())
+        return self._keys.get(key) if town_id is None else town_id
+
+    def lookup(self, name, limit=5, min_score=0.0):
+        """Best canonical towns for `name` as [(ID, canonical name, score)], best first.
+
+        A name equal to a canonical one (ignoring case and spacing), with the same
+        match key, or naming either part of "Name (Alternate)" scores 1.0 and comes
+        first. Otherwise only towns sharing at least
+        one n-gram with the query are considered, the CANDIDATES best by trigram
+        overlap are scored by edit similarity, and ties keep ID order.
+        """
+        key = match_key(name)
+        if not key:
+            return []
+        exact = self._exact_id(name, key)
+        if exact is not None and limit == 1:
+            return [(exact, self.names[exact], 1.0)]
+        grams = town_ngrams(key, self.n)
+        shared = {}
+        for gram in grams:
+            for town_id in self._postings.get(gram, ()):
+                shared[town_id] = shared.get(town_id, 0) + 1
+        overlap = sorted(shared, key=lambda town_id: (
+            town_id != exact, -2 * shared[town_id] / (len(grams) + self._gram_counts[town_id]), town_id))
+        scored = [(1.0 if town_id == exact else
+                   SequenceMatcher(None, key, self._match_keys[town_id], autojunk=False).ratio(), town_id)
+                  for town_id in overlap[:max(limit, CANDIDATES)]]
+        scored.sort(key=lambda item: (item[1] != exact, -item[0], item[1]))
+        return [(town_id, self.names[town_id], score)
+                for score, town_id in scored[:limit] if score >= min_score]
+
+    def match(self, name, min_score=DEFAULT_MIN_SCORE):
+        """(ID, score) of the best canonical town, or (-1, best score) when none reaches min_score."""
+        cache_key = (name, min_score)
+        hit = self._cache.get(cache_key)
+        if hit is None:
+            best = self.lookup(name, limit=1)
+            if best and best[0][2] >= min_score:
+                hit = (best[0][0], best[0][2])
+            else:
+                hit = (-1, best[0][2] if best else 0.0)
+            self._cache[cache_key] = hit
+        return hit
+
+    def add(self, name):
+        """Register `name` as a canonical town (no-op if that exact name is known); returns its ID, -1 for blank names."""
+        display = normalize_town(name)
+        if not match_key(display):
+            return -1
+        town_id = self._exact.get(display.casefold())
+        if town_id is None:
+            town_id = self._add(display)
+            self._cache.clear()  # earlier misses may match the new town
+        return town_id
+
+    def resolve(self, name, min_score=DEFAULT_MIN_SCORE):
+        """ID of `name`'s canonical town, registering it as a new town when nothing matches (-1 for blank names)."""
+        town_id, _ = self.match(name, min_score)
+        return self.add(name) if town_id < 0 else town_id
+
+    def canonical_ids(self, names, min_score=DEFAULT_MIN_SCORE):
+        """Canonical ID per name (-1 = no match), as a list."""
+        return [self.match(name, min_score)[0] for name in names]
+
+
+def load_town_index(csv_path=DEFAULT_CSV):
+    """TownIndex whose canonical towns are a CSV's Town column."""
+    return TownIndex(read_tourism_csv(csv_path, {'Town': 'str'})['Town'])
+
+
+def align_snapshots(source='data', min_score=DEFAULT_MIN_SCORE, index=None):
+    """Town ID for every town of every snapshot, oldest snapshot first.
+
+    Each snapshot's towns are matched against the towns known before it (`index`,
+    a fresh TownIndex when None); the ones with no match are then registered as new
+    towns, so distinct names within one file never merge with each other. Columns:
+    Snapshot, Town (as in the file), Town ID, Canonical Town, Score (1.0 for exact
+    and new towns).
+    """
+    index = TownIndex() if index is None else index
+    frames = []
+    for path in snapshot_paths(source):
+        towns = read_tourism_csv(path, {'Town': 'str'})['Town'].tolist()
+        matches = [index.match(town, min_score) for town in towns]  # before any of this file's towns are added
+        ids, scores = [], []
+        for town, (town_id, score) in zip(towns, matches):
+            if town_id < 0:
+                town_id, score = index.add(town), 1.0
+            ids.append(town_id)
+            scores.append(score)
+        frames.append(pd.DataFrame({
+            'Snapshot': snapshot_time(path),
+            'Town': towns,
+            'Town ID': ids,
+            'Canonical Town': [index.names[i] if i >= 0 else '' for i in ids],
+            'Score': scores,
+        }))
+    if not frames:
+        raise FileNotFoundError(f'no CSV snapshots found in {source!r}')
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fuzzy-match town names against a CSV, or align snapshot towns.')
+    parser.add_argument('names', nargs='*', help='town names or Observation URIs to look up')
+    parser.add_argument('--csv', default=DEFAULT_CSV, help='canonical towns for lookups')
+    parser.add_argument('--align', metavar='SOURCE', help='directory or glob of snapshot CSVs to align')
+    parser.add_argument('--limit', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.align:
+        start = time.perf_counter()
+        aligned = align_snapshots(args.align)
+        elapsed = time.perf_counter() - start
+        fuzzy = (aligned['Score'] < 1).sum()
+        print(f"✓ {len(aligned):,} town rows in {aligned['Snapshot'].nunique()} snapshot(s) -> "
+              f"{aligned['Town ID'].nunique():,} towns ({fuzzy:,} fuzzy matches) in {elapsed:.2f} s")
+    index = load_town_index(args.csv) if args.names else None
+    for name in args.names:
+        matches = index.lookup(name, limit=args.limit)
+        found = ', '.join(f'{town} ({score:.2f})' for _, town, score in matches) or 'no match'
+        print(f"✓ {name!r}: {found}")
+
+
+if __name__ == '__main__':
+    main()
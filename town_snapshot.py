@@ -0,0 +1,203 @@
+"""town_snapshot.py
+Memory-mapped binary snapshot of the cleaned town table, shared by worker processes.
+
+Every Streamlit worker that calls load_and_prepare() parses the CSV and keeps a
+private pandas copy of the same table. write_snapshot() instead exports the
+cleaned town table once as a columnar binary file, and open_snapshot() maps it
+read-only: the returned DataFrame's columns are views straight into the mapping,
+so every process on the host shares one page-cache copy and start-up is a
+header read rather than a CSV parse.
+
+File layout (all integers little-endian, every block 64-byte aligned):
+
+    b'TOWNSNAP' | uint64 header length | JSON header | column blocks ...
+
+- numeric columns: one fixed-width array each (dtype recorded in the header)
+- string columns: dictionary-encoded, i.e. an integer code array (-1 = missing,
+  in the width pandas uses for that many categories) plus a string table stored
+  as int64 offsets and one UTF-8 blob. They load as categoricals; with pyarrow
+  installed the string table itself is also mapped without copying.
+
+Usage:
+    town = shared_town_table()                      # export if missing/stale, then map
+    write_snapshot(town, 'town.snap'); town = open_snapshot('town.snap')
+
+Run: python town_snapshot.py [CSV] [-o .tourism_cache/town.snap]
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import tourism_cache
+from atomic_file import atomic_write
+from visualization_clean import DEFAULT_CSV, TOWN_TABLE_DTYPES, prepare_town_table, read_tourism_csv
+
+
+MAGIC = b'TOWNSNAP'
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT = os.path.join(tourism_cache.DEFAULT_CACHE_DIR, 'town.snap')
+
+# The cleaned town table plus Tourism Index, so both the drill-down cube and the
+# leaderboard can be served from the shared snapshot
+SNAPSHOT_DTYPES = {**TOWN_TABLE_DTYPES, 'Tourism Index': 'float32'}
+
+_ALIGN = 64
+
+
+def _pad(n):
+    return -n % _ALIGN
+
+
+def _column_blocks(frame):
+    """(column specs, list of byte blocks) for every column of `frame`."""
+    specs, blocks = [], []
+
+    def add(array):
+        array = np.ascontiguousarray(array)
+        if array.dtype.byteorder == '>' or (array.dtype.byteorder == '=' and not np.little_endian):
+            array = array.astype(array.dtype.newbyteorder('<'))
+        blocks.append(array.tobytes())
+        return {'dtype': array.dtype.str, 'block': len(blocks) - 1, 'length': len(array)}
+
+    for name in frame.columns:
+        s = frame[name]
+        if pd.api.types.is_numeric_dtype(s) and not isinstance(s.dtype, pd.CategoricalDtype):
+            specs.append({'name': str(name), 'kind': 'num', 'data': add(s.to_numpy())})
+            continue
+        cat = pd.Categorical(s)
+        encoded = [str(v).encode('utf-8') for v in cat.categories]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        specs.append({
+            'name': str(name), 'kind': 'dict',
+            'codes': add(cat.codes), 'offsets': add(offsets), 'blob': add(blob),
+        })
+    return specs, blocks
+
+
+def write_snapshot(frame, path, source=None):
+    """Write `frame` as a snapshot file (atomically). Returns the file size in bytes.
+
+    `source` is an opaque string stored in the header (shared_town_table keeps the
+    CSV fingerprint there to detect stale snapshots).
+    """
+    specs, blocks = _column_blocks(frame)
+    header = {'version': SNAPSHOT_VERSION, 'rows': len(frame), 'source': source, 'columns': specs}
+
+    # Offsets depend on the header length and vice versa: reserve a fixed-width
+    # field per block, lay out, then fill the real numbers in
+    for spec in specs:
+        for part in ('data', 'codes', 'offsets', 'blob'):
+            if part in spec:
+                spec[part]['offset'] = 0
+    prefix_len = len(MAGIC) + 8
+    header_len = len(json.dumps(header).encode()) + 20 * len(blocks) + 64
+    position = prefix_len + header_len + _pad(prefix_len + header_len)
+    block_offsets = []
+    for block in blocks:
+        block_offsets.append(position)
+        position += len(block) + _pad(len(block))
+    for spec in specs:
+        for part in ('data', 'codes', 'offsets', 'blob'):
+            if part in spec:
+                spec[part]['offset'] = block_offsets[spec[part].pop('block')]
+
+    header_bytes = json.dumps(header).encode().ljust(header_len)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with atomic_write(path) as f:  # Streamlit session threads may export concurrently
+        f.write(MAGIC + np.uint64(header_len).astype('<u8').tobytes() + header_bytes)
+        for offset, block in zip(block_offsets, blocks):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(block)
+    return position
+
+
+def read_header(path):
+    """The JSON header of a snapshot file (no data is mapped)."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a town snapshot')
+        header_len = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+        header = json.loads(f.read(header_len))
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {header.get('version')!r}")
+    return header
+
+
+def _string_table(mapped, spec):
+    offsets = _view(mapped, spec['offsets'])
+    blob = _view(mapped, spec['blob'])
+    try:
+        import pyarrow as pa
+    except ImportError:
+        data = blob.tobytes()
+        return pd.Index([data[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])], dtype=object)
+    strings = pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(blob))
+    return pd.Index(pd.arrays.ArrowStringArray(strings))  # buffers stay in the mapping
+
+
+def _view(mapped, part):
+    dtype = np.dtype(part['dtype'])
+    start = part['offset']
+    return mapped[start:start + part['length'] * dtype.itemsize].view(dtype)
+
+
+def open_snapshot(path):
+    """Map a snapshot read-only and return it as a DataFrame of zero-copy column views.
+
+    Numeric columns and categorical codes point into the mapping (they are not
+    writeable); string columns come back as categoricals.
+    """
+    header = read_header(path)
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    columns = {}
+    for spec in header['columns']:
+        if spec['kind'] == 'num':
+            columns[spec['name']] = _view(mapped, spec['data'])
+        else:
+            columns[spec['name']] = pd.Categorical.from_codes(_view(mapped, spec['codes']),
+                                                              categories=_string_table(mapped, spec))
+    frame = pd.DataFrame(columns, copy=False)
+    frame.attrs['snapshot_source'] = header.get('source')
+    return frame
+
+
+def build_town_table(csv_path=DEFAULT_CSV):
+    """Cleaned town table with Tourism Index, as stored in snapshots."""
+    return prepare_town_table(read_tourism_csv(csv_path, SNAPSHOT_DTYPES))
+
+
+def shared_town_table(csv_path=DEFAULT_CSV, snapshot_path=DEFAULT_SNAPSHOT):
+    """Memory-mapped town table for `csv_path`, exporting the snapshot first if it is missing or stale.
+
+    Staleness is checked against the CSV's stat() fingerprint, so a warm start
+    costs a stat and a header read.
+    """
+    source = tourism_cache.file_fingerprint(csv_path, content_hash=False)
+    try:
+        fresh = read_header(snapshot_path).get('source') == source
+    except (OSError, ValueError):
+        fresh = False
+    if not fresh:
+        write_snapshot(build_town_table(csv_path), snapshot_path, source=source)
+    return open_snapshot(snapshot_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export the cleaned town table as a memory-mappable snapshot.')
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('-o', '--out', default=DEFAULT_SNAPSHOT)
+    args = parser.parse_args(argv)
+
+    town = build_town_table(args.csv)
+    size = write_snapshot(town, args.out, source=tourism_cache.file_fingerprint(args.csv, content_hash=False))
+    print(f"✓ {args.out} written ({len(town):,} rows, {size:,} bytes; "
+          f"in-memory pandas copy {town.memory_usage(deep=True).sum():,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
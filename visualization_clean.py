@@ -10,30 +10,144 @@ This script:
 - applies Gestalt principles, pre-attentive attributes, and high data-ink ratio
 
 Run: python visualization_clean.py
+     python visualization_clean.py --assets assets [--gzip]      # page that loads a shared plotly.js
+     python visualization_clean.py --format csv|json [-o FILE]   # numbers only, never imports plotly
 or import and call visualization_clean.main() from a notebook.
+
+plotly is imported inside the chart functions, so importing this module for
+load_and_prepare() alone does not pay for it.
 """
+import argparse
+import io
 import os
 import math
+import sys
+import re
+import time
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 
+import instrumentation
+import tourism_cache
 
-def load_and_prepare(csv_path="data/551015b5649368dd2612f795c2a9c2d8_20240902_115953.csv"):
-    """Load CSV if present; perform the same light cleaning/renaming as the Streamlit app.
-    Returns an aggregated dataframe with Governorate and Total Facilities.
+
+DEFAULT_CSV = "data/551015b5649368dd2612f795c2a9c2d8_20240902_115953.csv"
+
+# The only raw columns the governorate aggregate needs, with compact parse dtypes.
+# Counts are parsed as float32 so blanks survive as NaN until the fillna below.
+AGGREGATE_DTYPES = {
+    'refArea': 'category',
+    'Total number of hotels': 'float32',
+    'Total number of restaurants': 'float32',
+    'Total number of cafes': 'float32',
+    'Total number of guest houses': 'float32',
+}
+
+# The cleaned town-level table (what tourism_cache stores) also keeps the town name
+TOWN_TABLE_DTYPES = {'Town': 'str', **AGGREGATE_DTYPES}
+
+FACILITY_TOTALS = ['Total Hotels', 'Total Restaurants', 'Total Cafes', 'Total Guest Houses']
+
+# Render budget: make_clean_bar draws at most this many bars (the smallest
+# categories are folded into one "Other" bar beyond it)
+MAX_BARS = 60
+
+
+def _pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_tourism_csv(csv_path, dtypes=None, engine='auto', **read_kwargs):
+    """Read only the columns named in `dtypes` (those present in the file) with those dtypes.
+
+    dtypes=None reads every column with inferred types (the original behaviour);
+    a None value inside `dtypes` selects the column but lets pandas infer its type.
+    engine='auto' uses pandas' pyarrow parser when pyarrow is installed and the C
+    parser otherwise; any explicit pandas engine name is passed through. Extra
+    keyword arguments (nrows, chunksize, ...) go to pd.read_csv.
     """
-    if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
-    else:
-        # Fallback sample data for quick testing / demonstration
-        df = pd.DataFrame({
-            "refArea": ["Beirut_Governorate", "Mount_Lebanon_Governorate", "North_Governorate", "South_Governorate"],
-            "Total number of hotels": [120, 80, 40, 20],
-            "Total number of restaurants": [200, 150, 80, 40],
-            "Total number of cafes": [100, 70, 30, 15],
-            "Total number of guest houses": [25, 10, 5, 2]
-        })
+    if engine == 'auto':
+        engine = 'pyarrow' if _pyarrow_available() and not read_kwargs else 'c'
+    with instrumentation.stage('parse_csv', engine=engine) as st:
+        df = _read_csv_columns(csv_path, dtypes, engine, read_kwargs)
+        if isinstance(df, pd.DataFrame):  # chunked reads return an iterator
+            st.rows = len(df)
+    return df
+
+
+def _read_csv_columns(csv_path, dtypes, engine, read_kwargs):
+    if dtypes is None:
+        return pd.read_csv(csv_path, engine=engine, **read_kwargs)
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [c for c in header if c in dtypes]
+    typed = {c: dtypes[c] for c in usecols if dtypes[c] is not None}
+    try:
+        return pd.read_csv(csv_path, usecols=usecols, dtype=typed, engine=engine, **read_kwargs)
+    except (ValueError, TypeError):
+        # A count column holds non-numeric text: parse it untyped and let the
+        # to_numeric(errors='coerce') step in load_and_prepare clean it up
+        return pd.read_csv(csv_path, usecols=usecols, engine=engine, **read_kwargs)
+
+
+def _sample_frame():
+    """Fallback sample data for quick testing / demonstration."""
+    return pd.DataFrame({
+        "refArea": ["Beirut_Governorate", "Mount_Lebanon_Governorate", "North_Governorate", "South_Governorate"],
+        "Total number of hotels": [120, 80, 40, 20],
+        "Total number of restaurants": [200, 150, 80, 40],
+        "Total number of cafes": [100, 70, 30, 15],
+        "Total number of guest houses": [25, 10, 5, 2]
+    })
+
+
+# refArea URI -> Governorate name, shared across calls (a few dozen distinct URIs per file)
+_GOVERNORATE_NAMES = {}
+_DBPEDIA_PREFIXES = ('https://dbpedia.org/page/', 'http://dbpedia.org/resource/')
+_AREA_SUFFIX = re.compile('_Governorate|_District.*')
 
+
+def _repair_mojibake(text):
+    """Undo UTF-8 text that was decoded as Latin-1 upstream ('ZahlÃ©' -> 'Zahlé')."""
+    try:
+        return text.encode('latin-1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
+
+
+def _governorate_name(ref_area):
+    name = _GOVERNORATE_NAMES.get(ref_area)
+    if name is None:
+        name = ref_area
+        for prefix in _DBPEDIA_PREFIXES:
+            name = name.replace(prefix, '')
+        name = _repair_mojibake(_AREA_SUFFIX.sub('', name).replace('_', ' '))
+        _GOVERNORATE_NAMES[ref_area] = name
+    return name
+
+
+def normalize_ref_area(ref_area):
+    """Map a refArea column to Governorate names.
+
+    The column is viewed as categorical so each distinct URI is cleaned once
+    (and then remembered in _GOVERNORATE_NAMES); the names are broadcast back to
+    the rows through the category codes. Missing refArea stays missing.
+    """
+    cat = ref_area if isinstance(ref_area.dtype, pd.CategoricalDtype) else ref_area.astype('category')
+    names = np.array([_governorate_name(str(c)) for c in cat.cat.categories] + [np.nan], dtype=object)
+    codes = cat.cat.codes.to_numpy()  # -1 (missing) picks the trailing NaN
+    return pd.Series(names[codes], index=ref_area.index, dtype=object)
+
+
+def prepare_town_table(df):
+    """Rename the facility columns, derive Governorate from refArea and coerce counts to int.
+
+    Returns the cleaned town-level table (one row per observation).
+    """
     # Safe rename mapping (mirror streamlit_app.py mapping where possible)
     rename_map = {
         'Total number of hotels': 'Total Hotels',
@@ -46,29 +160,41 @@ def load_and_prepare(csv_path="data/551015b5649368dd2612f795c2a9c2d8_20240902_11
 
     # Clean refArea -> Governorate
     if 'refArea' in df.columns:
-        df['Governorate'] = df['refArea'].astype(str).str.replace('https://dbpedia.org/page/', '', regex=False)
-        df['Governorate'] = df['Governorate'].str.replace('http://dbpedia.org/resource/', '', regex=False)
-        df['Governorate'] = df['Governorate'].str.replace('_Governorate|_District.*', '', regex=True)
-        df['Governorate'] = df['Governorate'].str.replace('_', ' ')
+        with instrumentation.stage('clean_ref_area', rows=len(df)):
+            df['Governorate'] = normalize_ref_area(df['refArea'])
     elif 'Governorate' not in df.columns:
         df['Governorate'] = 'Unknown'
 
     # Ensure numeric columns exist and fill NaN with 0
-    for c in ['Total Hotels', 'Total Restaurants', 'Total Cafes', 'Total Guest Houses']:
+    for c in FACILITY_TOTALS:
         if c not in df.columns:
             df[c] = 0
         df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype(int)
 
-    # Aggregate by governorate
-    agg = df.groupby('Governorate', dropna=True).agg({
-        'Total Hotels': 'sum',
-        'Total Restaurants': 'sum',
-        'Total Cafes': 'sum',
-        'Total Guest Houses': 'sum'
-    }).reset_index()
+    return df
+
+
+def governorate_sums(df):
+    """Per-governorate sums of the four facility counts, indexed by Governorate.
+
+    Partial sums from separate chunks of a file can be added together and passed
+    to finish_aggregate; the result equals aggregating the whole file at once.
+    """
+    with instrumentation.stage('groupby', rows=len(df)):
+        return df.groupby('Governorate', dropna=True).agg({
+            'Total Hotels': 'sum',
+            'Total Restaurants': 'sum',
+            'Total Cafes': 'sum',
+            'Total Guest Houses': 'sum'
+        })
+
+
+def finish_aggregate(sums):
+    """Turn governorate_sums output into the chart table (adds Total Facilities, sorts)."""
+    agg = sums.sort_index().reset_index()
 
     # Total facilities (this is the single metric we visualize)
-    agg['Total Facilities'] = agg[['Total Hotels', 'Total Restaurants', 'Total Cafes', 'Total Guest Houses']].sum(axis=1)
+    agg['Total Facilities'] = agg[FACILITY_TOTALS].sum(axis=1)
 
     # Sort descending for visual order (largest to smallest)
     agg = agg.sort_values('Total Facilities', ascending=False).reset_index(drop=True)
@@ -76,9 +202,333 @@ def load_and_prepare(csv_path="data/551015b5649368dd2612f795c2a9c2d8_20240902_11
     return agg
 
 
-def make_clean_bar(agg_df):
+def select_facilities(agg, columns):
+    """Recompute Total Facilities from a subset of the facility columns and re-sort.
+
+    `columns` is any subset of FACILITY_TOTALS, e.g. ['Total Hotels', 'Total Guest Houses'].
+    """
+    unknown = [c for c in columns if c not in FACILITY_TOTALS]
+    if unknown or not columns:
+        raise ValueError(f"columns must be a non-empty subset of {FACILITY_TOTALS}, got {list(columns)}")
+    agg = agg.sort_values('Governorate').reset_index(drop=True)
+    agg['Total Facilities'] = agg[list(columns)].sum(axis=1)
+    return agg.sort_values('Total Facilities', ascending=False).reset_index(drop=True)
+
+
+def aggregate_by_governorate(df):
+    """Sum the facility counts of a cleaned town-level table per governorate.
+    Returns Governorate, the four totals and Total Facilities, sorted descending.
+    """
+    return finish_aggregate(governorate_sums(df))
+
+
+def _chunk_rows_for_budget(csv_path, max_memory_mb, dtypes, sample_rows=2000):
+    """Rows per chunk that keep one parsed + cleaned chunk within max_memory_mb.
+
+    Measures the in-memory size of a cleaned sample and allows 2x headroom for
+    the temporaries created while cleaning.
+    """
+    sample = prepare_town_table(read_tourism_csv(csv_path, dtypes, engine='c', nrows=sample_rows))
+    per_row = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+    return max(1000, int(max_memory_mb * 1024 * 1024 / (2 * per_row)))
+
+
+def _fold_chunks(csv_path, dtypes, chunk_rows):
+    """Fold per-chunk governorate sums into one running total. Returns (sums, rows, chunks)."""
+    running = None
+    rows = chunks = 0
+    for chunk in read_tourism_csv(csv_path, dtypes, engine='c', chunksize=chunk_rows):
+        part = governorate_sums(prepare_town_table(chunk))
+        running = part if running is None else running.add(part, fill_value=0)
+        rows += len(chunk)
+        chunks += 1
+    if running is None:  # header-only file
+        running = governorate_sums(prepare_town_table(read_tourism_csv(csv_path, dtypes, engine='c')))
+    return running, rows, chunks
+
+
+def stream_aggregate(csv_path=DEFAULT_CSV, max_memory_mb=64, stats=None):
+    """Aggregate a CSV in bounded chunks; returns the same table as load_and_prepare.
+
+    Each chunk is parsed, cleaned and reduced to per-governorate partial sums that
+    are folded into a running total, so memory stays near max_memory_mb however
+    large the file is. If `stats` is a dict it receives rows, chunks, chunk_rows,
+    seconds, rows_per_s and mb_per_s.
+    """
+    start = time.perf_counter()
+    chunk_rows = _chunk_rows_for_budget(csv_path, max_memory_mb, AGGREGATE_DTYPES)
+    try:
+        running, rows, chunks = _fold_chunks(csv_path, AGGREGATE_DTYPES, chunk_rows)
+    except (ValueError, TypeError):
+        # A count column holds non-numeric text somewhere past the first chunk
+        untyped = {c: None for c in AGGREGATE_DTYPES}
+        running, rows, chunks = _fold_chunks(csv_path, untyped, chunk_rows)
+    agg = finish_aggregate(running.astype('int64'))
+
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        stats.update({
+            'rows': rows,
+            'chunks': chunks,
+            'chunk_rows': chunk_rows,
+            'seconds': seconds,
+            'rows_per_s': rows / seconds if seconds else 0.0,
+            'mb_per_s': os.path.getsize(csv_path) / 1e6 / seconds if seconds else 0.0,
+        })
+    return agg
+
+
+def byte_ranges(csv_path, shards):
+    """Split a CSV body into up to `shards` line-aligned (start, end) byte ranges.
+
+    Returns (header_bytes, ranges). Each boundary is moved forward to the next
+    line start, so every row lands in exactly one range. Rows are split on
+    newlines: quoted fields must not contain line breaks.
+    """
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        body_start = len(header)
+        bounds = [body_start]
+        for i in range(1, shards):
+            target = body_start + (size - body_start) * i // shards
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # finish the line that straddles the target (a no-op right after a newline)
+            if f.tell() < size and f.tell() > bounds[-1]:
+                bounds.append(f.tell())
+    bounds.append(size)
+    return header, [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _aggregate_range(csv_path, header, start, end, dtypes, engine):
+    """Parse, clean and reduce one byte range to per-governorate sums (runs in a pool worker)."""
+    data = bytearray(len(header) + end - start)  # header + range, read in place without a concat copy
+    data[:len(header)] = header
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        f.readinto(memoryview(data)[len(header):])
+    usecols = [c for c in pd.read_csv(io.BytesIO(header), nrows=0).columns if c in dtypes]
+    typed = {c: dtypes[c] for c in usecols}
+    try:
+        df = pd.read_csv(io.BytesIO(data), usecols=usecols, dtype=typed, engine=engine)
+    except (ValueError, TypeError):
+        df = pd.read_csv(io.BytesIO(data), usecols=usecols, engine=engine)  # same fallback as read_tourism_csv
+    return governorate_sums(prepare_town_table(df)), len(df)
+
+
+def parallel_aggregate(csv_path=DEFAULT_CSV, workers=None, engine='auto', stats=None):
+    """Aggregate a CSV over line-aligned byte ranges in a process pool.
+
+    The file is cut into one range per worker (see byte_ranges); each worker
+    parses, cleans and reduces its range with the same steps as load_and_prepare
+    and returns per-governorate partial sums, which are added together and
+    finished exactly as the serial path does. workers=None uses os.cpu_count();
+    workers=1 runs in-process. engine is resolved as in read_tourism_csv. If
+    `stats` is a dict it receives rows, shards, workers, seconds and rows_per_s.
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if engine == 'auto':
+        engine = 'pyarrow' if _pyarrow_available() else 'c'
+    header, ranges = byte_ranges(csv_path, workers)
+    jobs = [(csv_path, header, a, b, AGGREGATE_DTYPES, engine) for a, b in ranges]
+
+    if workers == 1 or len(jobs) <= 1:
+        parts = [_aggregate_range(*job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            parts = list(pool.map(_aggregate_range, *zip(*jobs)))
+
+    if not parts:  # header-only file
+        parts = [(governorate_sums(prepare_town_table(read_tourism_csv(csv_path, AGGREGATE_DTYPES, engine='c'))), 0)]
+    running = parts[0][0]
+    for part, _ in parts[1:]:
+        running = running.add(part, fill_value=0)
+    agg = finish_aggregate(running.astype('int64'))
+
+    if stats is not None:
+        rows = sum(n for _, n in parts)
+        seconds = time.perf_counter() - start
+        stats.update({
+            'rows': rows,
+            'shards': len(jobs),
+            'workers': workers,
+            'seconds': seconds,
+            'rows_per_s': rows / seconds if seconds else 0.0,
+        })
+    return agg
+
+
+def build_tables(csv_path=DEFAULT_CSV, engine='auto'):
+    """Parse, clean and aggregate a CSV. Returns (town_table, governorate_aggregate)."""
+    town = prepare_town_table(read_tourism_csv(csv_path, TOWN_TABLE_DTYPES, engine=engine))
+    return town, aggregate_by_governorate(town)
+
+
+def load_and_prepare(csv_path=DEFAULT_CSV, prune_columns=True, engine='auto',
+                     cache_dir=None, refresh_cache=False, max_cache_bytes=tourism_cache.DEFAULT_MAX_BYTES,
+                     max_memory_mb=None, stream_stats=None, with_summary=False, workers=None):
+    """Load CSV if present; perform the same light cleaning/renaming as the Streamlit app.
+    Returns an aggregated dataframe with Governorate and Total Facilities.
+
+    The table is built in one of four modes; cache_dir, max_memory_mb and workers
+    each select a mode, so at most one of them may be given (ValueError otherwise):
+
+    - plain (none of them): parse the CSV in one go. prune_columns=True parses only
+      refArea and the four "Total number of ..." columns (see AGGREGATE_DTYPES);
+      pass False to read the full file as before. Uses engine.
+    - cache_dir: the cleaned town table and the aggregate are cached there (see
+      tourism_cache) and reused while the CSV is unchanged. refresh_cache=True
+      forces a rebuild; max_cache_bytes bounds the size of the cache directory.
+      Uses engine.
+    - max_memory_mb: chunked streaming (see stream_aggregate) for files too large
+      to hold in memory; stream_stats, if a dict, receives its throughput.
+    - workers=N: parse the file in N line-aligned byte ranges on a process pool
+      (see parallel_aggregate); the result is identical to the plain mode. Uses
+      engine.
+
+    Options belonging to another mode are ignored: in particular prune_columns=False
+    has no effect outside the plain mode, since the other modes always parse a
+    fixed subset of columns.
+
+    with_summary=True returns (agg, summarize_aggregate(agg)) so the chart can
+    reuse the precomputed headline numbers.
+    """
+    modes = [name for name, value in (('cache_dir', cache_dir), ('max_memory_mb', max_memory_mb),
+                                      ('workers', workers)) if value is not None]
+    if len(modes) > 1:
+        raise ValueError(f"cache_dir, max_memory_mb and workers select different load modes; "
+                         f"got {' and '.join(modes)}")
+    with instrumentation.stage('load_and_prepare') as st:
+        if not os.path.exists(csv_path):
+            agg = aggregate_by_governorate(prepare_town_table(_sample_frame()))
+        elif cache_dir is not None:
+            _, agg = tourism_cache.load_cached_tables(
+                csv_path, lambda path: build_tables(path, engine=engine),
+                cache_dir=cache_dir, refresh=refresh_cache, max_bytes=max_cache_bytes)
+        elif max_memory_mb is not None:
+            agg = stream_aggregate(csv_path, max_memory_mb=max_memory_mb, stats=stream_stats)
+        elif workers is not None:
+            agg = parallel_aggregate(csv_path, workers=workers, engine=engine)
+        else:
+            df = read_tourism_csv(csv_path, AGGREGATE_DTYPES if prune_columns else None, engine=engine)
+            agg = aggregate_by_governorate(prepare_town_table(df))
+        st.rows = len(agg)
+
+    return (agg, summarize_aggregate(agg)) if with_summary else agg
+
+
+def summarize_aggregate(agg_df, top_n=2, mid_n=3, compare_n=5):
+    """Every number the chart annotations quote, from one pass over Total Facilities.
+
+    Returns a dict with:
+    - names, values: governorates and totals in descending rank order (numpy arrays)
+    - rank: per-row rank of agg_df (0 = largest; stable for ties)
+    - cumulative, cumulative_share: running totals along the ranking
+    - total, count, max_value
+    - top_*, mid_*, rest_*: names/values, total and share of ranks [0, top_n),
+      [top_n, top_n + mid_n) and the remainder
+    - compare_n, compare_total: the next compare_n governorates after the top slice
+    """
+    values = agg_df['Total Facilities'].to_numpy(dtype=np.int64)
+    order = np.argsort(-values, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    names = agg_df['Governorate'].to_numpy(dtype=object)[order]
+    values = values[order]
+
+    cumulative = np.cumsum(values)
+    total = int(cumulative[-1]) if len(cumulative) else 0
+    count = len(values)
+
+    def upto(k):
+        k = min(k, count)
+        return int(cumulative[k - 1]) if k > 0 else 0
+
+    def share(part):
+        return part / total if total else 0.0
+
+    mid_end = top_n + mid_n
+    top_total = upto(top_n)
+    mid_total = upto(mid_end) - top_total
+    rest_total = total - upto(mid_end)
+    return {
+        'names': names,
+        'values': values,
+        'rank': rank,
+        'cumulative': cumulative,
+        'cumulative_share': cumulative / total if total else np.zeros(count),
+        'total': total,
+        'count': count,
+        'max_value': int(values[0]) if count else 0,
+        'top_names': names[:top_n].tolist(),
+        'top_values': values[:top_n].tolist(),
+        'top_total': top_total,
+        'top_share': share(top_total),
+        'mid_names': names[top_n:mid_end].tolist(),
+        'mid_total': mid_total,
+        'mid_share': share(mid_total),
+        'rest_count': max(count - mid_end, 0),
+        'rest_total': rest_total,
+        'rest_share': share(rest_total),
+        'compare_n': min(compare_n, max(count - top_n, 0)),
+        'compare_total': upto(top_n + compare_n) - top_total,
+    }
+
+
+def top_k_with_other(agg_df, k, other_label='Other'):
+    """The k - 1 largest rows of agg_df by Total Facilities plus one "Other" row.
+
+    The top rows are found with np.partition (linear time) and only those are
+    sorted, so the cost stays flat however many categories the input has. The
+    "Other" row carries the exact sum of every folded count column; its
+    'Categories' value is how many rows it stands for (1 for the kept rows).
+    Tables with at most k rows are returned unchanged.
+    """
+    if k < 2:
+        raise ValueError(f'k must be at least 2 (one kept bar plus "Other"), got {k}')
+    n = len(agg_df)
+    if n <= k:
+        return agg_df
+
+    values = agg_df['Total Facilities'].to_numpy()
+    keep = k - 1
+    # keep-th largest value by partial selection; ties at that value are kept in input
+    # order. Values are never negated: totals may be unsigned (compact_table)
+    kth = np.partition(values, n - keep)[n - keep]
+    above = np.flatnonzero(values > kth)
+    top = np.concatenate([above, np.flatnonzero(values == kth)[:keep - len(above)]])
+    rank = np.unique(values[top], return_inverse=True)[1].reshape(-1)  # dense rank, signed for any dtype
+    top = top[np.lexsort((top, -rank))]  # descending, ties in input order
+    rest = np.ones(n, dtype=bool)
+    rest[top] = False
+
+    kept = agg_df.iloc[top].reset_index(drop=True)
+    kept['Categories'] = 1
+    other = {'Governorate': other_label, 'Categories': n - keep}
+    for col in kept.columns:
+        if col not in other and pd.api.types.is_numeric_dtype(agg_df[col]):
+            other[col] = agg_df[col].to_numpy()[rest].sum()
+    return pd.concat([kept, pd.DataFrame([other])], ignore_index=True)
+
+
+def make_clean_bar(agg_df, single_trace=True, summary=None, max_bars=MAX_BARS):
     """Build a decluttered Plotly bar chart following the assignment guidelines.
 
+    By default all bars are drawn as a single trace with per-point colors, text
+    and hover data. Pass single_trace=False for the legacy one-trace-per-bar
+    rendering (only practical for a few dozen categories).
+
+    At most max_bars bars are drawn: beyond that the smallest categories are
+    folded into one "Other" bar (see top_k_with_other) whose hover shows how many
+    categories it holds and their exact total. max_bars=None draws every row.
+
+    Every number in the annotations comes from `summary` (see summarize_aggregate;
+    computed here when not supplied), so the text always matches the data.
+
     Design principles applied:
     - HIGH DATA-INK RATIO: Remove all gridlines, backgrounds, and non-essential elements
     - GESTALT PRINCIPLES:
@@ -93,60 +543,134 @@ def make_clean_bar(agg_df):
     - VISUAL ORDER: Sorted descending, annotated strategically
     - WHITE SPACE: Generous margins, no clutter
     """
-    # Determine highlights (top 2 governorates)
-    top_n = 2
-    top_names = agg_df.loc[0:top_n-1, 'Governorate'].tolist() if len(agg_df) >= top_n else agg_df['Governorate'].tolist()
+    with instrumentation.stage('make_clean_bar', rows=len(agg_df)):
+        return _make_clean_bar(agg_df, single_trace, summary, max_bars)
+
+
+def update_clean_bar(fig, agg_df, summary=None, max_bars=MAX_BARS):
+    """Patch a figure from make_clean_bar in place for a new aggregate; returns the delta.
+
+    Only what depends on the data is recomputed: the bar arrays (x, y, text,
+    customdata, colors), the y-axis ticks and the annotation text/positions.
+    Layout, styling and the trace itself are reused, and properties whose value
+    did not change are not touched. All writes happen in one fig.batch_update().
+
+    The returned dict maps changed property paths ('data[0].y',
+    'layout.annotations[3].text', 'layout.yaxis.range', ...) to their new
+    values, which is exactly what a live client needs (Plotly.restyle /
+    Plotly.relayout, or a Dash Patch). An unchanged aggregate returns {}.
+    The patched figure is identical to make_clean_bar(agg_df, ...).
+
+    Only single-trace figures can be patched in place (the per-bar mode has one
+    trace per category); pass those to make_clean_bar instead.
+    """
+    if len(fig.data) != 1:
+        raise ValueError('update_clean_bar needs a single-trace figure (make_clean_bar(single_trace=True))')
+
+    with instrumentation.stage('update_clean_bar', rows=len(agg_df)):
+        summary, data = _bar_data(agg_df, summary, max_bars)
+        annotations = _bar_annotations(summary, data['ymax'])
+        trace = fig.data[0]
+
+        delta = {}
+        for key, value in (('x', data['x']), ('y', data['y']), ('text', data['y']),
+                           ('customdata', data['customdata']), ('marker.color', data['colors'])):
+            old = list(trace[key] if trace[key] is not None else ())
+            new = [str(v) for v in value] if key == 'text' else value  # plotly keeps bar text as strings
+            if old != new:
+                delta[f'data[0].{key}'] = value
+
+        yaxis = fig.layout.yaxis
+        if yaxis.dtick != data['dtick']:
+            delta['layout.yaxis.dtick'] = data['dtick']
+        if list(yaxis.range or ()) != data['y_range']:
+            delta['layout.yaxis.range'] = data['y_range']
+
+        current = fig.layout.annotations
+        if len(current) != len(annotations):
+            # The set of annotations changed (e.g. fewer than 3 categories): replace them all
+            delta['layout.annotations'] = annotations
+        else:
+            for i, (old, new) in enumerate(zip(current, annotations)):
+                for key in ('text', 'x', 'y'):
+                    if old[key] != new.get(key):
+                        delta[f'layout.annotations[{i}].{key}'] = new.get(key)
+
+        if delta:
+            with fig.batch_update():
+                for path, value in delta.items():
+                    fig[path] = value
+    return delta
+
+
+def _bar_data(agg_df, summary, max_bars):
+    """Everything in the bar chart that depends on the data: (summary, per-bar arrays and y ticks).
+
+    Shared by make_clean_bar and update_clean_bar so a patched figure is
+    identical to a rebuilt one.
+    """
+    if summary is None:
+        summary = summarize_aggregate(agg_df)
+
+    # Annotations quote the full data (summary); only the plotted bars are bucketed
+    if max_bars is not None and len(agg_df) > max_bars:
+        agg_df = top_k_with_other(agg_df, max_bars)
+        rank = np.arange(len(agg_df))  # already in descending order; "Other" is last
+        hover_names = agg_df['Governorate'].astype(str).to_numpy(dtype=object)
+        hover_names[-1] = f"{hover_names[-1]} ({agg_df['Categories'].iloc[-1]:,} categories)"
+        hover_names = pd.Series(hover_names)
+        max_val = int(agg_df['Total Facilities'].max())
+    else:
+        rank = summary['rank']
+        hover_names = agg_df['Governorate']
+        max_val = summary['max_value']
 
     # Enhanced color strategy with stronger hierarchy
     # Top 1: Deep vibrant blue (pre-attentive color for immediate focus)
     # Top 2: Complementary teal (secondary focus, similarity principle)
     # Rest: Very muted gray (reduced saturation & opacity for background context)
-    colors = []
-    text_colors = []  # For value labels
-    for g in agg_df['Governorate']:
-        if len(top_names) > 0 and g == top_names[0]:
-            colors.append('#0066CC')          # Strong blue for #1
-            text_colors.append('#FFFFFF')     # White text for contrast
-        elif len(top_names) > 1 and g == top_names[1]:
-            colors.append('#00A896')          # Teal for #2
-            text_colors.append('#FFFFFF')     # White text for contrast
-        else:
-            colors.append('#D3D3D3')          # Light gray (low saturation)
-            text_colors.append('#666666')     # Dark gray text for subtle visibility
+    colors = np.full(len(rank), '#D3D3D3', dtype=object)       # Light gray (low saturation)
+    colors[rank == 0] = '#0066CC'                               # Strong blue for #1
+    colors[rank == 1] = '#00A896'                               # Teal for #2
+    text_colors = np.where(rank < 2, '#FFFFFF', '#666666')      # White on highlights, dark gray otherwise
+    colors = colors.tolist()
 
-    x = agg_df['Governorate']
-    y = agg_df['Total Facilities']
+    x = agg_df['Governorate'].tolist()
+    y = agg_df['Total Facilities'].tolist()
 
     # Compute a sensible dtick for y-axis (round to nearest 50/100 depending on range)
-    max_val = int(y.max() if not y.empty else 0)
     if max_val <= 50:
         dtick = 10
     elif max_val <= 200:
         dtick = 25
     elif max_val <= 500:
         dtick = 50
-    else:
+    elif max_val <= 2000:
         dtick = 100
+    else:
+        # Large ranges (e.g. a bucketed "Other" bar): a 1/2/5 x 10^k step, ~10 ticks
+        step = 10 ** math.floor(math.log10(max_val / 10))
+        dtick = next(m * step for m in (1, 2, 5, 10) if max_val / (m * step) <= 10)
 
     ymax = math.ceil(max_val / dtick) * dtick if dtick > 0 else max_val
 
-    # Build the bar trace with enhanced visual encoding
-    fig = go.Figure()
-    
-    # Add bars individually for per-bar text color control
-    for i, (gov, count, color, txt_color) in enumerate(zip(x, y, colors, text_colors)):
-        fig.add_trace(go.Bar(
-            x=[gov],
-            y=[count],
-            marker_color=color,
-            marker_line_width=0,
-            text=[count],
-            textposition='outside',  # Always outside to avoid overlap
-            textfont=dict(size=13, color='#2C3E50', family='Arial, sans-serif', weight='bold'),
-            hovertemplate=f'<b>{gov}</b><br>Total Facilities: {count}<extra></extra>',
-            showlegend=False,
-            width=0.7  # Slightly narrower bars for better spacing (Gestalt proximity)
-        ))
+    return summary, {
+        'x': x,
+        'y': y,
+        'customdata': hover_names.tolist(),
+        'colors': colors,
+        'text_colors': text_colors.tolist(),
+        'dtick': dtick,
+        'ymax': ymax,
+        'y_range': [0, ymax * 1.35],  # Much more extra space for annotations and labels
+    }
+
+
+def _bar_annotations(summary, ymax):
+    """The chart's annotation dicts; every number in them comes from `summary`."""
+    # Determine highlights (top 2 governorates)
+    top_names = summary['top_names']
+    top_values = summary['top_values']
 
     # Add strategic annotations for context and focus
     annotations = []
@@ -155,7 +679,7 @@ def make_clean_bar(agg_df):
     annotations.append(dict(
         xref='paper', yref='paper',
         x=0, y=1.18,
-        text="<b>Beirut and Mount Lebanon Dominate Lebanon's Tourism Infrastructure</b>",
+        text=f"<b>{' and '.join(top_names)} Dominate Lebanon's Tourism Infrastructure</b>",
         showarrow=False,
         font=dict(size=28, color='#1A252F', family='Arial, sans-serif'),
         xanchor='left',
@@ -167,7 +691,7 @@ def make_clean_bar(agg_df):
     annotations.append(dict(
         xref='paper', yref='paper',
         x=0, y=1.08,
-        text="These two governorates account for the majority of hotels, restaurants, cafes, and guest houses",
+        text=f"These two governorates account for {summary['top_share']:.0%} of all hotels, restaurants, cafes, and guest houses",
         showarrow=False,
         font=dict(size=16, color='#5D6D7E', family='Arial, sans-serif'),
         xanchor='left',
@@ -179,7 +703,8 @@ def make_clean_bar(agg_df):
     annotations.append(dict(
         xref='paper', yref='paper',
         x=0, y=1.00,
-        text="Together they host 1,249 tourism facilities — nearly double the combined total of the next 5 governorates",
+        text=(f"Together they host {summary['top_total']:,} tourism facilities — compared with "
+              f"{summary['compare_total']:,} across the next {summary['compare_n']} governorates combined"),
         showarrow=False,
         font=dict(size=14, color='#85929E', family='Arial, sans-serif', style='italic'),
         xanchor='left',
@@ -189,8 +714,8 @@ def make_clean_bar(agg_df):
     
         # Simple labels ABOVE bars for top 2 governorates - offset horizontally to avoid overlap
     if len(top_names) > 0:
-        top1_val = int(agg_df.loc[agg_df['Governorate'] == top_names[0], 'Total Facilities'].iloc[0])
-        
+        top1_val = top_values[0]
+
         # Label above bar for #1 - Position to the left
         annotations.append(dict(
             x=top_names[0],
@@ -203,8 +728,8 @@ def make_clean_bar(agg_df):
         ))
     
     if len(top_names) > 1:
-        top2_val = int(agg_df.loc[agg_df['Governorate'] == top_names[1], 'Total Facilities'].iloc[0])
-        
+        top2_val = top_values[1]
+
         # Label above bar for #2 - Position to the right
         annotations.append(dict(
             x=top_names[1],
@@ -217,22 +742,18 @@ def make_clean_bar(agg_df):
         ))
     
     # Add comprehensive regional context annotation - LEFT ALIGNED
-    if len(agg_df) > 3:
-        # Calculate statistics for better context
-        top2_total = int(agg_df.iloc[0:2]['Total Facilities'].sum())
-        mid_range = agg_df.iloc[2:5] if len(agg_df) >= 5 else agg_df.iloc[2:]
-        mid_total = int(mid_range['Total Facilities'].sum())
-        rest_total = int(agg_df.iloc[5:]['Total Facilities'].sum()) if len(agg_df) > 5 else 0
-        total_all = int(agg_df['Total Facilities'].sum())
-        
+    if summary['count'] > 3:
         annotations.append(dict(
             xref='paper', yref='paper',
             x=0.25, y=0.65,
             text=(
                 f"<b>Regional Distribution Analysis:</b><br><br>"
-                f"• <b>Top 2 governorates</b> (Beirut & Mount Lebanon): {top2_total} facilities (51% of total)<br>"
-                f"• <b>Next 3 governorates</b> (Matn, Baalbek-Hermel, Mount Lebanon): {mid_total} facilities (26%)<br>"
-                f"• <b>Remaining {len(agg_df)-5} governorates</b>: {rest_total} facilities (23%)<br><br>"
+                f"• <b>Top {len(top_names)} governorates</b> ({' & '.join(top_names)}): "
+                f"{summary['top_total']:,} facilities ({summary['top_share']:.0%} of total)<br>"
+                f"• <b>Next {len(summary['mid_names'])} governorates</b> ({', '.join(summary['mid_names'])}): "
+                f"{summary['mid_total']:,} facilities ({summary['mid_share']:.0%})<br>"
+                f"• <b>Remaining {summary['rest_count']} governorates</b>: "
+                f"{summary['rest_total']:,} facilities ({summary['rest_share']:.0%})<br><br>"
                 f"<i>This concentration reveals significant regional inequality in tourism infrastructure,<br>"
                 f"with implications for economic development and visitor distribution across Lebanon.</i>"
             ),
@@ -261,9 +782,9 @@ def make_clean_bar(agg_df):
         x=0.98, y=0.92,
         text=(
             "<b>KEY INSIGHT</b><br><br>"
-            "51% of all tourism facilities<br>"
+            f"{summary['top_share']:.0%} of all tourism facilities<br>"
             "are concentrated in just<br>"
-            "2 out of 25+ governorates<br><br>"
+            f"{len(top_names)} out of {summary['count']} governorates<br><br>"
             "<i>This represents a significant<br>"
             "opportunity for regional<br>"
             "development and tourism<br>"
@@ -276,6 +797,55 @@ def make_clean_bar(agg_df):
         align='left'
     ))
 
+    return annotations
+
+
+def _make_clean_bar(agg_df, single_trace, summary, max_bars):
+    """Body of make_clean_bar (split out so the whole build is one instrumented stage)."""
+    import plotly.graph_objects as go
+
+    summary, data = _bar_data(agg_df, summary, max_bars)
+    x, y, hover_names = data['x'], data['y'], data['customdata']
+    colors, text_colors = data['colors'], data['text_colors']
+    dtick, ymax = data['dtick'], data['ymax']
+
+    # Build the bar trace with enhanced visual encoding
+    with instrumentation.stage('build_traces', rows=len(x), single_trace=single_trace):
+        fig = go.Figure()
+
+        if single_trace:
+            # One vectorized trace: per-point colors, labels and hover data travel as
+            # arrays, so figure size and layout cost stay flat as categories grow
+            fig.add_trace(go.Bar(
+                x=x,
+                y=y,
+                customdata=hover_names,
+                marker=dict(color=colors, line=dict(width=0)),
+                text=y,
+                textposition='outside',  # Always outside to avoid overlap
+                textfont=dict(size=13, color='#2C3E50', family='Arial, sans-serif', weight='bold'),
+                hovertemplate='<b>%{customdata}</b><br>Total Facilities: %{y}<extra></extra>',
+                showlegend=False,
+                width=0.7  # Slightly narrower bars for better spacing (Gestalt proximity)
+            ))
+        else:
+            # Add bars individually for per-bar text color control
+            for i, (gov, label, count, color, txt_color) in enumerate(zip(x, hover_names, y, colors, text_colors)):
+                fig.add_trace(go.Bar(
+                    x=[gov],
+                    y=[count],
+                    marker_color=color,
+                    marker_line_width=0,
+                    text=[count],
+                    textposition='outside',  # Always outside to avoid overlap
+                    textfont=dict(size=13, color='#2C3E50', family='Arial, sans-serif', weight='bold'),
+                    hovertemplate=f'<b>{label}</b><br>Total Facilities: {count}<extra></extra>',
+                    showlegend=False,
+                    width=0.7  # Slightly narrower bars for better spacing (Gestalt proximity)
+                ))
+
+    annotations = _bar_annotations(summary, ymax)
+
     # Layout: maximized white space, removed all non-data ink
     fig.update_layout(
         template='plotly_white',
@@ -313,7 +883,7 @@ def make_clean_bar(agg_df):
         zeroline=False,
         tickmode='linear',
         dtick=dtick,
-        range=[0, ymax * 1.35],  # Much more extra space for annotations and labels
+        range=data['y_range'],
         tickfont=dict(size=12, color='#5D6D7E', family='Arial, sans-serif'),
         ticks=''
     )
@@ -321,21 +891,223 @@ def make_clean_bar(agg_df):
     return fig
 
 
-def main():
-    """Generate and display the cleaned visualization."""
-    agg = load_and_prepare()
-    fig = make_clean_bar(agg)
+def make_trend_chart(series, highlight_n=2):
+    """Facility totals over time, one line per governorate, from a long-format series.
 
-    # If run as a script, open a browser tab (fig.show()) or return the figure for notebooks
-    try:
-        fig.show()
-    except Exception:
-        # In headless environments fig.show() may fail; instead write to an HTML file
-        out = 'visualization_clean_output.html'
-        fig.write_html(out)
-        print(f"✓ Output written to {out}")
-        print(f"✓ Design principles applied: High data-ink ratio, Gestalt principles, pre-attentive attributes")
+    `series` has Snapshot, Governorate and Total Facilities columns (see
+    snapshots.load_snapshots). The highlight_n largest governorates in the latest
+    snapshot are drawn in the bar chart's blue/teal; the rest stay muted gray
+    context lines, with the same decluttered styling as make_clean_bar.
+    """
+    import plotly.graph_objects as go
+
+    with instrumentation.stage('make_trend_chart', rows=len(series)):
+        wide = series.pivot_table(index='Snapshot', columns='Governorate',
+                                  values='Total Facilities', aggfunc='sum', fill_value=0).sort_index()
+        latest = wide.iloc[-1].sort_values(ascending=False, kind='stable') if len(wide) else wide.iloc[:0]
+        highlight_colors = ['#0066CC', '#00A896']
+        highlighted = list(latest.index[:min(highlight_n, len(highlight_colors))])
+
+        fig = go.Figure()
+        # Gray context first so the highlighted lines draw on top
+        for gov in list(latest.index[len(highlighted):]) + highlighted[::-1]:
+            is_top = gov in highlighted
+            color = highlight_colors[highlighted.index(gov)] if is_top else '#D3D3D3'
+            fig.add_trace(go.Scatter(
+                x=wide.index,
+                y=wide[gov],
+                name=str(gov),
+                mode='lines+markers',
+                line=dict(color=color, width=3 if is_top else 1.5),
+                marker=dict(size=7 if is_top else 4, color=color),
+                hovertemplate=f'<b>{gov}</b><br>%{{x|%Y-%m-%d}}: %{{y}} facilities<extra></extra>',
+                showlegend=False,
+            ))
+            # Direct label at the line end instead of a legend
+            if len(wide):
+                fig.add_annotation(
+                    x=wide.index[-1], y=wide[gov].iloc[-1], text=str(gov),
+                    xanchor='left', xshift=8, showarrow=False,
+                    font=dict(size=12 if is_top else 10, color=color if is_top else '#85929E',
+                              family='Arial, sans-serif'),
+                )
+
+        snapshots = len(wide)
+        fig.update_layout(
+            template='plotly_white',
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='white',
+            showlegend=False,
+            title=dict(
+                text=(f"<b>Tourism Facilities by Governorate, {snapshots} Snapshot{'s' * (snapshots != 1)}</b>"
+                      f"<br><sup>Highlighted: {' and '.join(map(str, highlighted))} (largest in the latest snapshot)</sup>"),
+                x=0, xanchor='left', font=dict(size=22, color='#1A252F', family='Arial, sans-serif'),
+            ),
+            margin=dict(l=100, r=180, t=120, b=80),
+            height=650,
+            width=1300,
+        )
+        fig.update_xaxes(showgrid=False, showline=True, linewidth=1, linecolor='#BDC3C7', ticks='',
+                         tickfont=dict(size=12, color='#2C3E50', family='Arial, sans-serif'))
+        fig.update_yaxes(title_text='Number of Tourism Facilities', showgrid=False, showline=True,
+                         linewidth=1, linecolor='#BDC3C7', zeroline=False, rangemode='tozero', ticks='',
+                         title_font=dict(size=14, color='#5D6D7E', family='Arial, sans-serif'),
+                         tickfont=dict(size=12, color='#5D6D7E', family='Arial, sans-serif'))
+    return fig
+
+
+def make_leaderboard_chart(board, by='Total Facilities', cols=4):
+    """Small multiples of a town leaderboard: one horizontal bar panel per governorate.
+
+    `board` is leaderboard.TownLeaderboard.top() output (Governorate, Rank, Town
+    and the metric columns). Within each panel the #1 town is drawn in the bar
+    chart's blue and the rest in muted gray, ranked top to bottom; the styling
+    follows make_clean_bar (no gridlines, light axis lines, direct value labels).
+    """
+    import plotly.graph_objects as go
 
+    with instrumentation.stage('make_leaderboard_chart', rows=len(board)):
+        panels = list(board.groupby('Governorate', sort=False))
+        rows = max(math.ceil(len(panels) / cols), 1)
+        per_panel = int(board['Rank'].max()) if len(board) else 0
+
+        # The grid is laid out here rather than with plotly.subplots.make_subplots:
+        # building the layout in one go is several times faster than updating
+        # dozens of subplot axes afterwards
+        h_gap, v_gap = 0.12, max(0.3 / rows, 0.02)
+        width = (1 - h_gap * (cols - 1)) / cols
+        height = (1 - v_gap * (rows - 1)) / rows
+        xaxis = dict(showgrid=False, showline=True, linewidth=1, linecolor='#BDC3C7', zeroline=False,
+                     ticks='', showticklabels=False)
+        yaxis = dict(showgrid=False, showline=False, ticks='',
+                     tickfont=dict(size=10, color='#5D6D7E', family='Arial, sans-serif'))
+
+        traces, axes, titles = [], {}, []
+        for i, (gov, panel) in enumerate(panels):
+            n = '' if i == 0 else str(i + 1)
+            left = (i % cols) * (width + h_gap)
+            top = 1 - (i // cols) * (height + v_gap)
+            axes[f'xaxis{n}'] = dict(xaxis, domain=[max(left, 0), min(left + width, 1)], anchor=f'y{n}')
+            axes[f'yaxis{n}'] = dict(yaxis, domain=[max(top - height, 0), min(top, 1)], anchor=f'x{n}')
+            titles.append(dict(text=str(gov), x=left + width / 2, y=top, xref='paper', yref='paper',
+                               xanchor='center', yanchor='bottom', showarrow=False,
+                               font=dict(size=13, color='#2C3E50', family='Arial, sans-serif')))
+
+            panel = panel.sort_values('Rank', ascending=False)  # rank 1 drawn at the top
+            colors = np.where(panel['Rank'].to_numpy() == 1, '#0066CC', '#D3D3D3').tolist()
+            traces.append(dict(
+                type='bar',
+                x=panel[by].tolist(),
+                y=panel['Town'].tolist(),
+                xaxis=f'x{n}',
+                yaxis=f'y{n}',
+                orientation='h',
+                marker=dict(color=colors, line=dict(width=0)),
+                text=panel[by].tolist(),
+                textposition='outside',
+                textfont=dict(size=10, color='#2C3E50', family='Arial, sans-serif'),
+                customdata=panel['Rank'].tolist(),
+                hovertemplate=f'<b>%{{y}}</b> (#%{{customdata}} in {gov})<br>{by}: %{{x}}<extra></extra>',
+                showlegend=False,
+            ))
+
+        fig = go.Figure(data=traces, layout=dict(
+            template='plotly_white',
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='white',
+            showlegend=False,
+            title=dict(text=f'<b>Top {per_panel} Towns per Governorate by {by}</b>', x=0, xanchor='left',
+                       font=dict(size=22, color='#1A252F', family='Arial, sans-serif')),
+            annotations=titles,
+            margin=dict(l=60, r=40, t=110, b=40),
+            height=max(400, rows * (60 + 22 * per_panel)),
+            width=1500,
+            bargap=0.25,
+            **axes,
+        ))
+    return fig
+
+
+def aggregate_text(agg, fmt):
+    """The aggregate table as 'csv' or 'json' (a list of row objects) text."""
+    if fmt == 'csv':
+        return agg.to_csv(index=False)
+    if fmt == 'json':
+        return agg.to_json(orient='records', force_ascii=False) + '\n'
+    raise ValueError(f"fmt must be 'csv' or 'json', got {fmt!r}")
+
+
+def export_aggregate(agg, fmt, out=None):
+    """Write the aggregate table as 'csv' or 'json' (a list of row objects) to `out` or stdout."""
+    text = aggregate_text(agg, fmt)
+    if out is None or out == '-':
+        sys.stdout.write(text)
+    else:
+        with open(out, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+
+
+def main(argv=None):
+    """Generate and display the cleaned visualization.
+
+    argv: command-line arguments (the script passes sys.argv[1:]; None means no
+    options, which keeps main() callable from a notebook).
+    """
+    parser = argparse.ArgumentParser(description='Render the tourism facilities by governorate chart.')
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--format', choices=['chart', 'csv', 'json'], default='chart',
+                        help='csv/json print the aggregate table only (plotly is never imported)')
+    parser.add_argument('-o', '--output', default=None, metavar='FILE',
+                        help='with --format csv/json, write to FILE instead of stdout')
+    parser.add_argument('--assets', default=None, metavar='DIR',
+                        help='write the chart to an HTML file that loads plotly.js from DIR '
+                             '(written once) instead of inlining it; skips fig.show()')
+    parser.add_argument('--gzip', action='store_true',
+                        help='with --assets, also write pre-compressed .html.gz copies')
+    parser.add_argument('--profile', action='store_true',
+                        help='emit per-stage timing/memory JSON lines (same as TOURISM_PROFILE=1)')
+    parser.add_argument('--profile-output', default=None, metavar='FILE',
+                        help='append profile JSON lines to FILE instead of stderr')
+    args = parser.parse_args(argv if argv is not None else [])
+    if args.gzip and not args.assets:
+        parser.error('--gzip requires --assets')
+    if args.profile or args.profile_output:
+        instrumentation.enable(args.profile_output)
+
+    if args.format != 'chart':
+        with instrumentation.stage('main', format=args.format):
+            export_aggregate(load_and_prepare(args.csv), args.format, args.output)
+        return
+
+    with instrumentation.stage('main'):
+        agg, summary = load_and_prepare(args.csv, with_summary=True)
+        fig = make_clean_bar(agg, summary=summary)
+
+        if args.assets:
+            _write_chart_html(fig, args.assets, args.gzip)
+            return
+
+        # If run as a script, open a browser tab (fig.show()) or return the figure for notebooks
+        try:
+            with instrumentation.stage('show'):
+                fig.show()
+        except Exception:
+            # In headless environments fig.show() may fail; instead write to an HTML file
+            _write_chart_html(fig)
+
+
+def _write_chart_html(fig, asset_dir=None, gzip_copy=False):
+    """Write main()'s chart to visualization_clean_output.html, inlining plotly.js
+    unless asset_dir is given (then it is referenced from there, see html_export)."""
+    out = 'visualization_clean_output.html'
+    with instrumentation.stage('write_html', shared_assets=asset_dir is not None):
+        if asset_dir is None:
+            fig.write_html(out)
+        else:
+            from html_export import write_shared_html
+            write_shared_html(fig, out, asset_dir, gzip_copy=gzip_copy)
+    print(f"✓ Output written to {out}")
+    print(f"✓ Design principles applied: High data-ink ratio, Gestalt principles, pre-attentive attributes")
 
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1:])